@@ -6,7 +6,6 @@ Configuration Management Database (CMDB) table relationships, showing both
 CI relationships and class inheritance hierarchies.
 """
 
-from .graph_builder import CMDBGraphBuilder
 from .cli import main
 
 __version__ = "0.1.0"
@@ -16,4 +15,13 @@ __email__ = ""
 __all__ = [
     "CMDBGraphBuilder",
     "main",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # CMDBGraphBuilder pulls in networkx and matplotlib; import it on first use
+    # so that the command line entry point starts quickly.
+    if name == "CMDBGraphBuilder":
+        from .graph_builder import CMDBGraphBuilder
+        return CMDBGraphBuilder
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
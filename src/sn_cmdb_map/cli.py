@@ -5,18 +5,52 @@ ServiceNow CMDB Mapping Tool
 Main entry point for the ServiceNow CMDB table relationship mapping tool.
 """
 
-from .graph_builder import CMDBGraphBuilder
 import sys
-import argparse
 import os
-from pathlib import Path
-from dotenv import load_dotenv
+import stat
+from types import SimpleNamespace
 
 
-def main():
-    """Main function for the CMDB mapping tool."""
-    # Load environment variables from .env file if it exists
-    load_dotenv()
+LAYOUT_CHOICES = ("auto", "spring", "kamada_kawai", "planar", "circular", "random", "shell", "spectral", "spiral", "multipartite", "all")
+_LAYOUT_CHOICE_SET = frozenset(LAYOUT_CHOICES)
+
+# Options understood by the fast command line parser, mapped to their argparse
+# dest and, for flags, the value they store
+_FLAG_OPTIONS = {
+    "--shortest-path": ("shortest_path", True),
+    "--no-cache": ("cache", False),
+}
+_VALUE_OPTIONS = {
+    "--data-dir": ("data_dir", str),
+    "--layout": ("layout", str),
+    "--jobs": ("jobs", int),
+}
+
+# Builder shared by the worker processes of a parallel '--layout all' run
+_worker_builder = None
+
+
+def _init_worker(builder):
+    """Install the already-built graph builder in a worker process."""
+    global _worker_builder
+    _worker_builder = builder
+
+
+def _render_layout(table_name, target_table, shortest_path_only, paths, layout):
+    """Render a single layout using the worker's graph builder."""
+    return _worker_builder.visualize_table_graph(
+        table_name,
+        output_dir="path_graphs",
+        target_table=target_table,
+        shortest_path_only=shortest_path_only,
+        layout=layout,
+        precomputed_paths=paths
+    )
+
+
+def build_parser():
+    """Build the argument parser for the CMDB mapping tool."""
+    import argparse
     
     parser = argparse.ArgumentParser(
         description="Create paths between ServiceNow CMDB tables"
@@ -39,7 +73,7 @@ def main():
     parser.add_argument(
         "--layout",
         type=str,
-        choices=["auto", "spring", "kamada_kawai", "planar", "circular", "random", "shell", "spectral", "spiral", "multipartite", "all"],
+        choices=LAYOUT_CHOICES,
         default="auto",
         help="Graph layout algorithm to use (default: auto - tries layouts in optimal order)"
     )
@@ -48,8 +82,87 @@ def main():
         action="store_true",
         help="Show only the shortest path (default: show all paths)"
     )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="Rebuild the graph and layouts instead of reusing those computed on a previous run "
+             "(by default they are reused while the data files are unchanged)"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="Number of worker processes used with --layout all (default: 0 = one per CPU, up to one per layout; 1 = render serially)"
+    )
+    return parser
+
+
+def _parse_args_fast(argv):
+    """Parse a well-formed command line without building an ArgumentParser.
+    
+    Returns None for anything out of the ordinary (help, unknown or
+    abbreviated options, bad values, wrong number of tables) so that the
+    full argparse parser can handle it and report errors consistently.
+    """
+    values = {
+        "data_dir": None,
+        "layout": "auto",
+        "shortest_path": False,
+        "cache": True,
+        "jobs": 0,
+    }
+    positionals = []
     
-    args = parser.parse_args()
+    tokens = iter(argv)
+    for token in tokens:
+        if token in _FLAG_OPTIONS:
+            dest, value = _FLAG_OPTIONS[token]
+            values[dest] = value
+        elif token in _VALUE_OPTIONS:
+            dest, convert = _VALUE_OPTIONS[token]
+            value = next(tokens, None)
+            if value is None or value.startswith("-"):
+                return None
+            try:
+                values[dest] = convert(value)
+            except ValueError:
+                return None
+        elif token.startswith("-"):
+            return None
+        else:
+            positionals.append(token)
+    
+    if len(positionals) != 2 or values["layout"] not in _LAYOUT_CHOICE_SET:
+        return None
+    
+    values["source_table"], values["target_table"] = positionals
+    return SimpleNamespace(**values)
+
+
+def main(argv=None):
+    """Main function for the CMDB mapping tool.
+    
+    Parses argv, or the process's command line arguments when argv is None.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    # Common invocations skip argparse entirely; it is only built for --help
+    # and for command lines that need its error reporting
+    args = _parse_args_fast(argv)
+    if args is None:
+        args = build_parser().parse_args(argv)
+    
+    # Heavy imports are deferred until the arguments are known to be valid so
+    # that --help and usage errors do not pay for networkx/matplotlib
+    from .graph_builder import CMDBGraphBuilder
+    
+    # Load environment variables from .env file if it exists; only needed
+    # when the data directory was not given on the command line
+    if not args.data_dir:
+        from dotenv import load_dotenv
+        load_dotenv()
     
     # Determine data directory from multiple sources (priority order):
     # 1. Command line argument
@@ -63,11 +176,13 @@ def main():
     
     # Validate data directory if specified
     if data_dir:
-        data_path = Path(data_dir)
-        if not data_path.exists():
+        # One stat call answers both "exists" and "is a directory"
+        try:
+            data_stat = os.stat(data_dir)
+        except FileNotFoundError:
             print(f"Error: Data directory '{data_dir}' does not exist")
             sys.exit(1)
-        if not data_path.is_dir():
+        if not stat.S_ISDIR(data_stat.st_mode):
             print(f"Error: '{data_dir}' is not a directory")
             sys.exit(1)
     
@@ -75,7 +190,7 @@ def main():
     builder = CMDBGraphBuilder(data_dir=data_dir)
     
     # Build the graph silently
-    graph = builder.build_graph()
+    graph = builder.build_graph(use_cache=args.cache)
     
     if not graph:
         print("Error: Failed to build graph")
@@ -85,24 +200,56 @@ def main():
     table_name = args.source_table
     target_table = args.target_table
     
+    # A single reachability check is far cheaper than attempting every layout
+    # only to find there is nothing to draw
+    if not builder.has_path_between_tables(table_name, target_table):
+        print(f"No paths found between '{table_name}' and '{target_table}'")
+        sys.exit(1)
+    
     # Handle 'all' layout option
     if args.layout == "all":
         # Generate graphs for all available layouts
-        layouts = ["spring", "kamada_kawai", "planar", "circular", "random", "shell", "spectral", "spiral", "multipartite"]
+        layouts = [layout for layout in LAYOUT_CHOICES if layout not in ("auto", "all")]
         success_count = 0
         total_layouts = len(layouts)
         
-        for layout in layouts:
-            print(f"Generating graph with {layout} layout...")
-            success = builder.visualize_table_graph(
-                table_name, 
-                output_dir="path_graphs", 
-                target_table=target_table, 
-                shortest_path_only=args.shortest_path,
-                layout=layout
-            )
-            if success:
-                success_count += 1
+        # Every layout draws the same paths, so find them only once
+        paths = builder.compute_paths(table_name, target_table, args.shortest_path)
+        if not paths:
+            print(f"No paths found between '{table_name}' and '{target_table}'")
+            sys.exit(1)
+        
+        # One worker per CPU by default, never more than there are layouts
+        jobs = min(args.jobs if args.jobs > 0 else (os.cpu_count() or 1), total_layouts)
+        
+        if jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            
+            # Layouts are independent, so render them concurrently. The built
+            # builder is shipped to each worker once instead of once per layout.
+            with ProcessPoolExecutor(max_workers=jobs,
+                                     initializer=_init_worker,
+                                     initargs=(builder,)) as executor:
+                futures = []
+                for layout in layouts:
+                    print(f"Generating graph with {layout} layout...")
+                    futures.append(executor.submit(
+                        _render_layout, table_name, target_table, args.shortest_path, paths, layout
+                    ))
+                success_count = sum(1 for future in futures if future.result())
+        else:
+            for layout in layouts:
+                print(f"Generating graph with {layout} layout...")
+                success = builder.visualize_table_graph(
+                    table_name, 
+                    output_dir="path_graphs", 
+                    target_table=target_table, 
+                    shortest_path_only=args.shortest_path,
+                    layout=layout,
+                    precomputed_paths=paths
+                )
+                if success:
+                    success_count += 1
         
         if success_count > 0:
             print(f"\nGraphs saved to: {builder.output_base_dir}/path_graphs/")
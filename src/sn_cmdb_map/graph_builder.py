@@ -6,28 +6,177 @@ This script creates a directed graph of ServiceNow CMDB tables using NetworkX.
 Nodes represent CMDB tables and edges represent relationships between them.
 """
 
+import hashlib
+import heapq
+import importlib.util
 import json
-import networkx as nx
-from pathlib import Path
-from typing import Dict, List, Set, Tuple
-import numpy as np
-import sys
-from collections import defaultdict
 import math
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+import mmap
 import os
+import pickle
 import random
+import re
+import sys
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import islice
+from operator import attrgetter, itemgetter
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Set, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+import networkx as nx
+import numpy as np
 try:
-    from networkx_viewer import Viewer
-    NETWORKX_VIEWER_AVAILABLE = True
-    NETWORKX_VIEWER_ERROR = None
-except ImportError as e:
-    NETWORKX_VIEWER_AVAILABLE = False
-    NETWORKX_VIEWER_ERROR = str(e)
+    # ijson picks its fastest available backend (yajl2_c when compiled)
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+try:
+    # Parses whole documents several times faster than the standard library
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+try:
+    # Decodes only the fields each loader reads, straight into typed records
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+# Sparse adjacency for whole-graph statistics on large graphs. Imported by
+# _get_graph_statistics_sparse rather than here, since SciPy is slow to load
+# and most runs never compute statistics.
+SCIPY_AVAILABLE = importlib.util.find_spec("scipy") is not None
+# Rasterizes very large graphs that matplotlib cannot draw in reasonable time.
+# Only looked up here; its import stack (pandas, numba, dask, xarray) is loaded
+# by _export_datashader_graph when a graph actually needs it.
+DATASHADER_AVAILABLE = importlib.util.find_spec("datashader") is not None
+
+# nx.forceatlas2_layout is only available in NetworkX 3.4 and later
+FORCEATLAS2_AVAILABLE = hasattr(nx, "forceatlas2_layout")
+
+# Largest graph the auto layout hands to kamada_kawai; its solver scales cubically
+KAMADA_KAWAI_MAX_NODES = 100
+
+# Largest graph for which the auto layout falls back to spring_layout directly;
+# beyond it forceatlas2 is tried first, which unlike spring_layout at 500 nodes
+# and more does not need SciPy
+SPRING_MAX_NODES = 300
+
+# Smallest graph the auto layout draws with the spectral layout first; it only
+# needs a few eigenvectors of the sparse Laplacian
+SPECTRAL_MIN_NODES = 500
+
+# Exports larger than this are streamed with ijson rather than parsed in one go
+STREAMING_THRESHOLD_BYTES = 64 * 1024 * 1024
+
+# zlib level for PNG output; deflate at the default level 6 is a large share of
+# savefig time for big figures while level 3 is much faster for a modest size cost
+PNG_COMPRESS_LEVEL = 3
+
+# GraphML attr.type for each attribute value type the streaming writer handles
+GRAPHML_TYPES = {bool: 'boolean', int: 'int', float: 'double', str: 'string'}
+
+# Fields each loader reads from its export, as (field, default) pairs. A None
+# default is replaced by a value derived from another field of the record.
+TABLE_FIELDS = (('name', ''), ('sys_id', ''), ('label', None), ('super_class', ''),
+                ('sys_scope', 'global'), ('sys_package', ''), ('is_extendable', 'false'))
+RELATIONSHIP_TYPE_FIELDS = (('sys_id', ''), ('name', ''), ('parent_descriptor', ''),
+                            ('child_descriptor', ''), ('sys_name', ''), ('sys_scope', 'global'))
+PACKAGE_FIELDS = (('source', ''), ('sys_id', ''), ('name', None), ('version', ''),
+                  ('license_category', 'none'), ('sys_class_name', ''), ('active', 'true'))
+SUGGESTED_RELATIONSHIP_FIELDS = (('base_class', ''), ('dependent_class', ''),
+                                 ('cmdb_rel_type', ''), ('parent', 'false'))
+
+# msgspec decoders built for each of the field lists above
+_FIELD_DECODERS = {}
+
+# Node colour and legend prefix by package source prefix in visualize_table_graph;
+# sources matching none of the prefixes use PACKAGE_DEFAULT_STYLE
+PACKAGE_STYLES = (('sn_', '#9C27B0', 'SN Package'), ('com.', '#FF9800', 'Plugin'))
+PACKAGE_DEFAULT_STYLE = ('#607D8B', 'Package')
+
+# Legend label and node colour by package source prefix in the whole-graph drawings
+SCOPE_PACKAGE_STYLES = (('sn_', 'ServiceNow Packages', '#9C27B0'), ('com.', 'Plugins/Extensions', '#FF9800'))
+SCOPE_PACKAGE_DEFAULT_STYLE = ('Other Packages', '#607D8B')
+
+# Every known prefix at once, so unprefixed sources skip the per-prefix checks
+PACKAGE_STYLE_PREFIXES = tuple(prefix for prefix, _, _ in PACKAGE_STYLES)
+
+# Bump when the set or shape of cached builder state changes
+GRAPH_CACHE_VERSION = 2
+
+# Attributes shared by every class hierarchy edge. Read-only because the same
+# mapping is passed for each edge; NetworkX copies it into the edge data.
+HIERARCHY_EDGE_ATTRS = MappingProxyType({
+    'relationship_type': 'class_hierarchy',
+    'label': 'parent of',
+    'source_file': 'sys_db_object.json',
+    'scope': 'hierarchy',
+    'edge_type': 'hierarchy',  # Mark as hierarchy edge
+    'style': 'dotted'  # Visual hint for dotted lines
+})
+
+# Stand-in for the table info of nodes missing from self.tables, shared by the
+# drawing loops instead of allocating an empty dict per node
+NO_TABLE_INFO = MappingProxyType({})
+
+# Package name prefixes rewritten by get_package_display_name, matched in one scan
+PACKAGE_PREFIX_RE = re.compile(r'@servicenow/|@devsnc/|com\.')
+PACKAGE_PREFIX_LABELS = {'@servicenow/': 'SN: ', '@devsnc/': 'DevSNC: '}
+WORD_SEPARATORS = str.maketrans('-_', '  ')
+
+# pyplot, patches and Line2D once matplotlib has been set up by _load_matplotlib
+_MATPLOTLIB = None
+
+
+def _load_matplotlib():
+    """Import matplotlib with the non-interactive backend on first use.
+    
+    matplotlib is not imported at module level so that loading and analysing
+    graphs does not pay for it; rendering functions call this instead, and
+    only the first call does the imports and the backend switch.
+    """
+    global _MATPLOTLIB
+    if _MATPLOTLIB is None:
+        import matplotlib
+        matplotlib.use('Agg')  # Use non-interactive backend
+        import matplotlib.pyplot as plt
+        import matplotlib.patches as patches
+        from matplotlib.lines import Line2D
+        _MATPLOTLIB = (plt, patches, Line2D)
+    return _MATPLOTLIB
+
+
+# Builder and figure of a generate_all_table_graphs worker process
+_worker_builder = None
+_worker_figure = None
+
+
+def _init_render_worker(builder):
+    """Install the already-built graph builder in a worker process."""
+    global _worker_builder
+    _worker_builder = builder
+
+
+def _render_table_graph(table_name, output_dir):
+    """Render one table graph on the worker's figure."""
+    global _worker_figure
+    if _worker_figure is None:
+        plt, _, _ = _load_matplotlib()
+        _worker_figure = plt.figure()
+    return _worker_builder.visualize_table_graph(table_name, output_dir, fig=_worker_figure)
+
 
 class CMDBGraphBuilder:
+    # Builder state restored from the on-disk graph cache
+    _CACHED_ATTRIBUTES = ('graph', 'tables', 'relationship_types', 'packages', 'sys_id_to_table',
+                          '_inheritance_chains')
+    
     def __init__(self, data_dir: str = None):
         """Initialize the CMDB graph builder."""
         # If data_dir is provided, use it; otherwise use current directory
@@ -37,12 +186,68 @@ class CMDBGraphBuilder:
         self.relationship_types = {}  # Store relationship type information
         self.packages = {}  # Store package information
         self.sys_id_to_table = {}  # Mapping from sys_id to table name
+        self._node_attrs_cache = {}  # Memoized _get_node_attributes results
+        self._label_cache = {}  # Memoized get_table_display_label results
+        self._layout_memo = {}  # Layouts computed in this process by graph topology
+        self._children_of = defaultdict(list)  # super_class -> direct subclasses
+        self._inheritance_chains = {}  # table -> precomputed super_class chain
+        self.use_cache = False  # Reuse on-disk graph and layout caches
+        self._pending_nodes = {}  # Nodes waiting to be inserted into the graph
+        self._pending_edges = []  # Edges waiting to be inserted into the graph
+        self._defer_graph_updates = False  # Set while build_graph batches insertion
         
         # Create timestamped output directory
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.output_base_dir = self.base_path / f"cmdb_analysis_{timestamp}"
         self.output_base_dir.mkdir(exist_ok=True)
         
+    def _iter_records(self, json_file: Path) -> Iterator[Dict]:
+        """Yield the entries of the 'records' array of a ServiceNow JSON export."""
+        with open(json_file, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            if IJSON_AVAILABLE and (not ORJSON_AVAILABLE or file_size > STREAMING_THRESHOLD_BYTES):
+                # Stream records one at a time instead of materializing the whole document
+                yield from ijson.items(f, 'records.item')
+            elif ORJSON_AVAILABLE:
+                if file_size:
+                    # Parse straight from the page cache instead of copying the file into a bytes object
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        with memoryview(mapped) as view:
+                            data = orjson.loads(view)
+                else:
+                    data = orjson.loads(b"")
+                yield from data.get('records', [])
+            else:
+                data = json.load(f)
+                yield from data.get('records', [])
+    
+    def _iter_fields(self, json_file: Path, fields: Tuple[Tuple[str, Any], ...]) -> Iterator[Tuple]:
+        """Yield a tuple of the requested field values for each record of an export."""
+        file_size = json_file.stat().st_size
+        if not MSGSPEC_AVAILABLE or (IJSON_AVAILABLE and file_size > STREAMING_THRESHOLD_BYTES):
+            for record in self._iter_records(json_file):
+                yield tuple(record.get(name, default) for name, default in fields)
+            return
+        
+        decoder = _FIELD_DECODERS.get(fields)
+        if decoder is None:
+            # Fields not listed are skipped by the decoder instead of being built into dicts
+            record_type = msgspec.defstruct('Record', [(name, Any, default) for name, default in fields])
+            export_type = msgspec.defstruct('Export', [('records', List[record_type], [])])
+            decoder = _FIELD_DECODERS[fields] = msgspec.json.Decoder(export_type)
+        
+        with open(json_file, 'rb') as f:
+            if file_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    with memoryview(mapped) as view:
+                        export = decoder.decode(view)
+            else:
+                export = decoder.decode(b"")
+        
+        get_values = attrgetter(*(name for name, _ in fields))
+        for record in export.records:
+            yield get_values(record)
+    
     def load_tables(self) -> None:
         """Load table information from sys_db_object.json."""
         tables_file = self.base_path / "sys_db_object.json"
@@ -50,35 +255,45 @@ class CMDBGraphBuilder:
             print(f"Warning: {tables_file} not found. Continuing without table metadata.")
             return
             
+        # Cached node attributes are derived from the table metadata
+        self._node_attrs_cache.clear()
+        self._label_cache.clear()
+        
         try:
-            with open(tables_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # First pass: create sys_id to table name mapping
+            # Single pass over the records: a super_class may refer to a table
+            # that appears later in the file, so names are resolved afterwards
             self.sys_id_to_table = {}
-            if 'records' in data:
-                for record in data['records']:
-                    table_name = record.get('name', '')
-                    sys_id = record.get('sys_id', '')
-                    if table_name and sys_id:
+            for table_name, sys_id, label, super_class_id, scope, package, is_extendable in self._iter_fields(tables_file, TABLE_FIELDS):
+                if table_name:
+                    # Every later reference to this table shares one string object
+                    table_name = sys.intern(table_name)
+                    if sys_id:
                         self.sys_id_to_table[sys_id] = table_name
-                
-                # Second pass: build table info with resolved super_class names
-                for record in data['records']:
-                    table_name = record.get('name', '')
-                    if table_name:
-                        super_class_id = record.get('super_class', '')
-                        super_class_name = self.sys_id_to_table.get(super_class_id, '') if super_class_id else ''
-                        
-                        self.tables[table_name] = {
-                            'label': record.get('label', table_name),
-                            'super_class': super_class_name,
-                            'super_class_id': super_class_id,
-                            'scope': record.get('sys_scope', 'global'),
-                            'package': record.get('sys_package', ''),
-                            'is_extendable': record.get('is_extendable', 'false') == 'true'
-                        }
-                        
+                    
+                    self.tables[table_name] = {
+                        'label': table_name if label is None else label,
+                        'super_class': '',
+                        'super_class_id': super_class_id,
+                        'scope': scope,
+                        'package': package,
+                        'is_extendable': is_extendable == 'true'
+                    }
+            
+            # Resolve super_class sys_ids to table names and index each
+            # table under its super_class for the hierarchy edges
+            self._children_of = defaultdict(list)
+            for table_name, table_info in self.tables.items():
+                super_class_id = table_info['super_class_id']
+                if super_class_id:
+                    super_class = self.sys_id_to_table.get(super_class_id, '')
+                    table_info['super_class'] = super_class
+                    if super_class and super_class != table_name:
+                        self._children_of[super_class].append(table_name)
+            
+            # Walk every super_class chain once now that all names are resolved
+            self._inheritance_chains = {
+                table_name: tuple(self._walk_inheritance_chain(table_name)) for table_name in self.tables
+            }
             
         except Exception as e:
             print(f"Error loading tables: {e}")
@@ -91,22 +306,17 @@ class CMDBGraphBuilder:
             return
             
         try:
-            with open(rel_types_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            if 'records' in data:
-                for record in data['records']:
-                    rel_id = record.get('sys_id', '')
-                    if rel_id:
-                        self.relationship_types[rel_id] = {
-                            'name': record.get('name', ''),
-                            'parent_descriptor': record.get('parent_descriptor', ''),
-                            'child_descriptor': record.get('child_descriptor', ''),
-                            'sys_name': record.get('sys_name', ''),
-                            'scope': record.get('sys_scope', 'global')
-                        }
-                        
-            
+            for rel_id, name, parent_descriptor, child_descriptor, sys_name, scope in self._iter_fields(rel_types_file, RELATIONSHIP_TYPE_FIELDS):
+                if rel_id:
+                    self.relationship_types[rel_id] = {
+                        'name': name,
+                        'parent_descriptor': parent_descriptor,
+                        'child_descriptor': child_descriptor,
+                        'sys_name': sys_name,
+                        'scope': scope
+                    }
+                    
+        
         except Exception as e:
             print(f"Error loading relationship types: {e}")
     
@@ -118,29 +328,23 @@ class CMDBGraphBuilder:
             return
             
         try:
-            with open(packages_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            for source, sys_id, name, version, license_category, sys_class_name, active in self._iter_fields(packages_file, PACKAGE_FIELDS):
+                package_info = {
+                    'name': source if name is None else name,
+                    'version': version,
+                    'license_category': license_category,
+                    'sys_class_name': sys_class_name,
+                    'active': active == 'true',
+                    'source': source
+                }
                 
-            if 'records' in data:
-                for record in data['records']:
-                    source = record.get('source', '')
-                    sys_id = record.get('sys_id', '')
-                    package_info = {
-                        'name': record.get('name', source),
-                        'version': record.get('version', ''),
-                        'license_category': record.get('license_category', 'none'),
-                        'sys_class_name': record.get('sys_class_name', ''),
-                        'active': record.get('active', 'true') == 'true',
-                        'source': source
-                    }
+                # Index by both source and sys_id for flexibility
+                if source:
+                    self.packages[source] = package_info
+                if sys_id:
+                    self.packages[sys_id] = package_info
                     
-                    # Index by both source and sys_id for flexibility
-                    if source:
-                        self.packages[source] = package_info
-                    if sys_id:
-                        self.packages[sys_id] = package_info
-                        
-            
+        
         except Exception as e:
             print(f"Error loading packages: {e}")
     
@@ -153,52 +357,60 @@ class CMDBGraphBuilder:
             
         relationships_added = 0
         
+        # Collect nodes and edges first and insert them in bulk at the end;
+        # a plain set avoids the DiGraph __contains__ wrapper in the hot loop
+        known_nodes = self.graph.nodes.keys() | self._pending_nodes.keys()
+        nodes_needed = {}
+        edges = []
+        
         try:
-            with open(rel_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            for base_class, dependent_class, rel_type_id, parent in self._iter_fields(rel_file, SUGGESTED_RELATIONSHIP_FIELDS):
+                is_parent = parent.lower() == 'true'
                 
-            if 'records' in data:
-                for record in data['records']:
-                    base_class = record.get('base_class', '')
-                    dependent_class = record.get('dependent_class', '')
-                    rel_type_id = record.get('cmdb_rel_type', '')
-                    is_parent = record.get('parent', 'false').lower() == 'true'
+                if base_class and dependent_class and rel_type_id:
+                    base_class = sys.intern(base_class)
+                    dependent_class = sys.intern(dependent_class)
                     
-                    if base_class and dependent_class and rel_type_id:
-                        # Get relationship type info
-                        rel_info = self.relationship_types.get(rel_type_id, {})
-                        rel_name = rel_info.get('name', f'rel_{rel_type_id[:8]}')
-                        
-                        # Determine direction based on parent/child designation
-                        if is_parent:
-                            # base_class is parent, dependent_class is child
-                            source = base_class
-                            target = dependent_class
-                            edge_label = rel_info.get('parent_descriptor', rel_name.split('::')[0] if '::' in rel_name else rel_name)
-                        else:
-                            # base_class is child, dependent_class is parent
-                            source = dependent_class
-                            target = base_class
-                            edge_label = rel_info.get('child_descriptor', rel_name.split('::')[1] if '::' in rel_name else rel_name)
-                        
-                        # Add nodes if they don't exist
-                        if source not in self.graph:
-                            self.graph.add_node(source, **self._get_node_attributes(source))
-                        if target not in self.graph:
-                            self.graph.add_node(target, **self._get_node_attributes(target))
-                        
-                        # Add edge with relationship information
-                        edge_attrs = {
-                            'relationship_type': rel_name,
-                            'relationship_id': rel_type_id,
-                            'label': edge_label,
-                            'source_file': file_name,
-                            'scope': rel_info.get('scope', 'global')
-                        }
-                        
-                        self.graph.add_edge(source, target, **edge_attrs)
-                        relationships_added += 1
-                        
+                    # Get relationship type info
+                    rel_info = self.relationship_types.get(rel_type_id, {})
+                    rel_name = rel_info.get('name', f'rel_{rel_type_id[:8]}')
+                    
+                    # Determine direction based on parent/child designation
+                    if is_parent:
+                        # base_class is parent, dependent_class is child
+                        source = base_class
+                        target = dependent_class
+                        edge_label = rel_info.get('parent_descriptor', rel_name.split('::')[0] if '::' in rel_name else rel_name)
+                    else:
+                        # base_class is child, dependent_class is parent
+                        source = dependent_class
+                        target = base_class
+                        edge_label = rel_info.get('child_descriptor', rel_name.split('::')[1] if '::' in rel_name else rel_name)
+                    
+                    # Add nodes if they don't exist
+                    if source not in known_nodes:
+                        known_nodes.add(source)
+                        nodes_needed[source] = self._get_node_attributes(source)
+                    if target not in known_nodes:
+                        known_nodes.add(target)
+                        nodes_needed[target] = self._get_node_attributes(target)
+                    
+                    # Add edge with relationship information
+                    edge_attrs = {
+                        'relationship_type': rel_name,
+                        'relationship_id': rel_type_id,
+                        'label': edge_label,
+                        'source_file': file_name,
+                        'scope': rel_info.get('scope', 'global')
+                    }
+                    
+                    edges.append((source, target, edge_attrs))
+                    relationships_added += 1
+            
+            self._pending_nodes.update(nodes_needed)
+            self._pending_edges.extend(edges)
+            if not self._defer_graph_updates:
+                self.flush_pending_graph_updates()
             return relationships_added
             
         except Exception as e:
@@ -206,19 +418,32 @@ class CMDBGraphBuilder:
             return 0
     
     def _get_node_attributes(self, table_name: str) -> Dict:
-        """Get node attributes for a table."""
-        table_info = self.tables.get(table_name, {})
-        return {
-            'label': table_info.get('label', table_name),
-            'super_class': table_info.get('super_class', ''),
-            'scope': table_info.get('scope', 'unknown'),
-            'package': table_info.get('package', ''),
-            'is_extendable': table_info.get('is_extendable', False),
-            'type': 'cmdb_table'
-        }
+        """Get node attributes for a table.
+        
+        The result is memoized and shared, so callers must not mutate it;
+        NetworkX copies attribute dicts when nodes are added.
+        """
+        attrs = self._node_attrs_cache.get(table_name)
+        if attrs is None:
+            table_info = self.tables.get(table_name, {})
+            attrs = {
+                'label': table_info.get('label', table_name),
+                'super_class': table_info.get('super_class', ''),
+                'scope': table_info.get('scope', 'unknown'),
+                'package': table_info.get('package', ''),
+                'is_extendable': table_info.get('is_extendable', False),
+                'type': 'cmdb_table'
+            }
+            self._node_attrs_cache[table_name] = attrs
+        return attrs
     
     def get_table_display_label(self, table_name: str, max_length: int = 25) -> str:
         """Get the human-readable display label for a table."""
+        # Labels are requested for the same tables over and over while rendering
+        display_name = self._label_cache.get((table_name, max_length))
+        if display_name is not None:
+            return display_name
+        
         table_info = self.tables.get(table_name, {})
         label = table_info.get('label', table_name)
         
@@ -233,10 +458,18 @@ class CMDBGraphBuilder:
         if len(display_name) > max_length:
             display_name = display_name[:max_length-3] + "..."
         
+        self._label_cache[(table_name, max_length)] = display_name
         return display_name
     
     def get_table_inheritance_chain(self, table_name: str) -> List[str]:
         """Get the inheritance chain for a table following super_class hierarchy."""
+        chain = self._inheritance_chains.get(table_name)
+        if chain is None:
+            return self._walk_inheritance_chain(table_name)
+        return list(chain)
+    
+    def _walk_inheritance_chain(self, table_name: str) -> List[str]:
+        """Follow super_class links from a table up to its root class."""
         chain = [table_name]
         current_table = table_name
         visited = set()  # Prevent infinite loops
@@ -256,15 +489,10 @@ class CMDBGraphBuilder:
     
     def find_inherited_relationships(self, target_table: str) -> Set[str]:
         """Find all tables that have relationships applicable to target_table via inheritance."""
-        inheritance_chain = self.get_table_inheritance_chain(target_table)
-        applicable_tables = set()
-        
-        # For each table in the inheritance chain, find tables that have relationships to them
-        for ancestor_table in inheritance_chain:
-            if ancestor_table in self.graph:
-                applicable_tables.add(ancestor_table)
+        inheritance_chain = self._inheritance_chains.get(target_table) or (target_table,)
         
-        return applicable_tables
+        # The tables in the inheritance chain that take part in any relationship
+        return self.graph.nodes.keys() & inheritance_chain
 
     def get_package_display_name(self, package_source: str, max_length: int = 30) -> str:
         """Get the human-readable display name for a package."""
@@ -277,16 +505,16 @@ class CMDBGraphBuilder:
         name = package_info.get('name', package_source)
         
         # Clean up common prefixes and make more readable
-        if name.startswith('@servicenow/'):
-            name = name.replace('@servicenow/', 'SN: ')
-        elif name.startswith('@devsnc/'):
-            name = name.replace('@devsnc/', 'DevSNC: ')
-        elif name.startswith('com.'):
-            # Convert com.glide.service-portal -> Service Portal
-            parts = name.split('.')
-            if len(parts) > 2:
-                name = ' '.join(word.title() for word in parts[2:])
-                name = name.replace('-', ' ').replace('_', ' ')
+        prefix_match = PACKAGE_PREFIX_RE.match(name)
+        if prefix_match:
+            prefix = prefix_match.group()
+            if prefix == 'com.':
+                # Convert com.glide.service-portal -> Service Portal
+                parts = name.split('.')
+                if len(parts) > 2:
+                    name = ' '.join(word.title() for word in parts[2:]).translate(WORD_SEPARATORS)
+            else:
+                name = name.replace(prefix, PACKAGE_PREFIX_LABELS[prefix])
         elif package_source.startswith('sn_'):
             # Use the friendly name if available, otherwise clean up the source
             if not name or name == package_source:
@@ -301,46 +529,121 @@ class CMDBGraphBuilder:
     def add_class_hierarchy_edges(self) -> int:
         """Add class hierarchy edges based on super_class relationships."""
         hierarchy_edges_added = 0
-        
-        for table_name, table_info in self.tables.items():
-            super_class = table_info.get('super_class', '')
-            
-            if super_class and super_class != table_name:
-                # Add nodes if they don't exist
-                if table_name not in self.graph:
-                    self.graph.add_node(table_name, **self._get_node_attributes(table_name))
-                if super_class not in self.graph:
-                    self.graph.add_node(super_class, **self._get_node_attributes(super_class))
-                
-                # Add hierarchy edge with special attributes
-                edge_attrs = {
-                    'relationship_type': 'class_hierarchy',
-                    'label': 'parent of',
-                    'source_file': 'sys_db_object.json',
-                    'scope': 'hierarchy',
-                    'edge_type': 'hierarchy',  # Mark as hierarchy edge
-                    'style': 'dotted'  # Visual hint for dotted lines
-                }
+        known_nodes = self.graph.nodes.keys() | self._pending_nodes.keys()
+        nodes_needed = {}
+        edges = []
+        
+        for super_class, subclasses in self._children_of.items():
+            # Add nodes if they don't exist
+            if super_class not in known_nodes:
+                known_nodes.add(super_class)
+                nodes_needed[super_class] = self._get_node_attributes(super_class)
+            
+            for table_name in subclasses:
+                if table_name not in known_nodes:
+                    known_nodes.add(table_name)
+                    nodes_needed[table_name] = self._get_node_attributes(table_name)
                 
                 # Parent -> Child relationship (superclass is parent of subclass)
-                self.graph.add_edge(super_class, table_name, **edge_attrs)
+                edges.append((super_class, table_name, HIERARCHY_EDGE_ATTRS))
                 hierarchy_edges_added += 1
         
+        self._pending_nodes.update(nodes_needed)
+        self._pending_edges.extend(edges)
+        if not self._defer_graph_updates:
+            self.flush_pending_graph_updates()
+        
         return hierarchy_edges_added
+    
+    def flush_pending_graph_updates(self) -> None:
+        """Insert all buffered nodes and edges into the graph in one pass each."""
+        self.graph.add_nodes_from(self._pending_nodes.items())
+        self.graph.add_edges_from(self._pending_edges)
+        self._pending_nodes = {}
+        self._pending_edges = []
 
-    def build_graph(self) -> nx.DiGraph:
-        """Build the complete CMDB relationship graph."""
+    def get_graph_cache_file(self) -> Path:
+        """Get the graph cache file for the current contents of the data directory."""
+        # Key on the resolved directory and the name, mtime and size of every
+        # JSON file so that any change to the exports invalidates the cache
+        key_parts = [f"v{GRAPH_CACHE_VERSION}", str(self.base_path.resolve())]
+        for json_file in sorted(self.base_path.glob("*.json")):
+            file_stat = json_file.stat()
+            key_parts.append(f"{json_file.name}:{file_stat.st_mtime_ns}:{file_stat.st_size}")
+        key = hashlib.blake2b("\n".join(key_parts).encode('utf-8'), digest_size=16).hexdigest()
+        return self._get_cache_dir() / f"graph_{key}.pkl"
+    
+    @staticmethod
+    def _get_cache_dir() -> Path:
+        """Get the per-user directory holding graph and layout caches."""
+        cache_root = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / ".cache")
+        return cache_root / "sn_cmdb_map"
+    
+    @staticmethod
+    def _write_cache_file(cache_file: Path, data) -> None:
+        """Pickle data to a cache file without exposing a partially written file."""
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so readers never see a partial cache
+            temp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_file, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, cache_file)
+        except Exception as e:
+            print(f"Warning: Could not write cache {cache_file}: {e}")
+    
+    def load_graph_cache(self) -> bool:
+        """Restore a previously built graph from the on-disk cache."""
+        cache_file = self.get_graph_cache_file()
+        if not cache_file.exists():
+            return False
+        
+        try:
+            with open(cache_file, 'rb') as f:
+                state = pickle.load(f)
+            for attribute in self._CACHED_ATTRIBUTES:
+                setattr(self, attribute, state[attribute])
+            # Memoized lookups were derived from the replaced table metadata
+            self._node_attrs_cache.clear()
+            self._label_cache.clear()
+            return True
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable graph cache {cache_file}: {e}")
+            return False
+    
+    def save_graph_cache(self) -> None:
+        """Save the built graph to the on-disk cache."""
+        cache_file = self.get_graph_cache_file()
+        state = {attribute: getattr(self, attribute) for attribute in self._CACHED_ATTRIBUTES}
+        self._write_cache_file(cache_file, state)
+    
+    def build_graph(self, use_cache: bool = False) -> nx.DiGraph:
+        """Build the complete CMDB relationship graph, optionally reusing the on-disk cache."""
+        self.use_cache = use_cache
+        if use_cache and self.load_graph_cache():
+            return self.graph
+        
         # Load metadata silently
         self.load_tables()
         self.load_relationship_types()
         self.load_packages()
         
-        # Add relationships from both suggested relationship files
-        self.add_suggested_relationships("cmdb_rel_type_suggest.json")
-        self.add_suggested_relationships("em_suggested_relation_type.json")
+        # Buffer the relationship and hierarchy edges and build the graph from
+        # them in a single bulk insertion
+        self._defer_graph_updates = True
+        try:
+            # Add relationships from both suggested relationship files
+            self.add_suggested_relationships("cmdb_rel_type_suggest.json")
+            self.add_suggested_relationships("em_suggested_relation_type.json")
+            
+            # Add class hierarchy edges
+            self.add_class_hierarchy_edges()
+        finally:
+            self._defer_graph_updates = False
+        self.flush_pending_graph_updates()
         
-        # Add class hierarchy edges
-        self.add_class_hierarchy_edges()
+        if use_cache:
+            self.save_graph_cache()
         
         return self.graph
     
@@ -348,6 +651,9 @@ class CMDBGraphBuilder:
         """Get detailed statistics about the graph."""
         if not self.graph:
             return {}
+        
+        if SCIPY_AVAILABLE:
+            return self._get_graph_statistics_sparse()
             
         stats = {
             'nodes': self.graph.number_of_nodes(),
@@ -356,13 +662,47 @@ class CMDBGraphBuilder:
             'is_connected': nx.is_weakly_connected(self.graph) if self.graph.is_directed() else nx.is_connected(self.graph),
             'number_of_components': nx.number_weakly_connected_components(self.graph) if self.graph.is_directed() else nx.number_connected_components(self.graph),
             'density': nx.density(self.graph),
-            'average_degree': sum(dict(self.graph.degree()).values()) / self.graph.number_of_nodes() if self.graph.number_of_nodes() > 0 else 0
+            # Every edge adds one to the degree of each of its ends
+            'average_degree': 2 * self.graph.number_of_edges() / self.graph.number_of_nodes() if self.graph.number_of_nodes() > 0 else 0
         }
         
-        # Top nodes by degree
+        # Top nodes by degree; nlargest keeps only ten candidates instead of sorting every node
         if self.graph.number_of_nodes() > 0:
             degree_centrality = nx.degree_centrality(self.graph)
-            stats['top_central_nodes'] = sorted(degree_centrality.items(), key=lambda x: x[1], reverse=True)[:10]
+            stats['top_central_nodes'] = heapq.nlargest(10, degree_centrality.items(), key=itemgetter(1))
+        
+        return stats
+    
+    def get_adjacency_matrix(self):
+        """Get the graph as a SciPy CSR adjacency matrix and its row order of table names."""
+        nodes = list(self.graph.nodes())
+        return nx.to_scipy_sparse_array(self.graph, nodelist=nodes, weight=None, format='csr'), nodes
+    
+    def _get_graph_statistics_sparse(self) -> Dict:
+        """Compute get_graph_statistics from a CSR adjacency matrix."""
+        from scipy.sparse.csgraph import connected_components
+        
+        adjacency, nodes = self.get_adjacency_matrix()
+        node_count = len(nodes)
+        
+        # Out-degree is the row length, in-degree the number of times a column appears
+        degrees = np.diff(adjacency.indptr) + np.bincount(adjacency.indices, minlength=node_count)
+        component_count, _ = connected_components(adjacency, directed=True, connection='weak')
+        
+        stats = {
+            'nodes': node_count,
+            'edges': self.graph.number_of_edges(),
+            'is_directed': self.graph.is_directed(),
+            'is_connected': component_count == 1,
+            'number_of_components': int(component_count),
+            'density': nx.density(self.graph),
+            'average_degree': int(degrees.sum()) / node_count
+        }
+        
+        # Same scaling and tie order as nx.degree_centrality with heapq.nlargest
+        scale = 1.0 / (node_count - 1) if node_count > 1 else 1.0
+        degree_centrality = [(node, degree * scale) for node, degree in zip(nodes, degrees.tolist())]
+        stats['top_central_nodes'] = heapq.nlargest(10, degree_centrality, key=itemgetter(1))
         
         return stats
     
@@ -379,12 +719,16 @@ class CMDBGraphBuilder:
             elif format_type.lower() == "gml":
                 nx.write_gml(self.graph, output_path)
             elif format_type.lower() == "graphml":
-                nx.write_graphml(self.graph, output_path)
+                if not self._fast_write_graphml(output_path):
+                    nx.write_graphml(self.graph, output_path)
             elif format_type.lower() == "json":
                 # Export as JSON using node-link format
                 graph_data = nx.node_link_data(self.graph)
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    json.dump(graph_data, f, indent=2, ensure_ascii=False)
+                if ORJSON_AVAILABLE:
+                    output_path.write_bytes(orjson.dumps(graph_data, option=orjson.OPT_INDENT_2))
+                else:
+                    with open(output_path, 'w', encoding='utf-8') as f:
+                        json.dump(graph_data, f, indent=2, ensure_ascii=False)
             elif format_type.lower() == "png":
                 # Export as PNG using matplotlib visualization
                 success = self._export_png_graph(output_path)
@@ -400,32 +744,137 @@ class CMDBGraphBuilder:
             print(f"Error exporting graph: {e}")
             return ""
     
+    def _fast_write_graphml(self, output_path: Path) -> bool:
+        """Stream the graph to GraphML without building an XML tree in memory.
+        
+        Returns False without writing anything when the graph holds attribute
+        values of a type this writer does not handle, or values of different
+        types under one attribute name.
+        """
+        # Declare one key per attribute name, numbered in order of first use
+        keys = {}
+        for element, items in (('node', self.graph.nodes(data=True)), ('edge', self.graph.edges(data=True))):
+            for *_, data in items:
+                for name, value in data.items():
+                    attr_type = GRAPHML_TYPES.get(type(value))
+                    if attr_type is None:
+                        return False
+                    key = keys.get((element, name))
+                    if key is None:
+                        keys[(element, name)] = (f"d{len(keys)}", attr_type)
+                    elif key[1] != attr_type:
+                        # nx.write_graphml declares a separate key per type for these
+                        return False
+        node_keys = {name: key_id for (element, name), (key_id, _) in keys.items() if element == 'node'}
+        edge_keys = {name: key_id for (element, name), (key_id, _) in keys.items() if element == 'edge'}
+        
+        def data_elements(data, element_keys):
+            return ''.join(f'<data key="{element_keys[name]}">{escape(str(value))}</data>'
+                           for name, value in data.items())
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            write = f.write
+            write("<?xml version='1.0' encoding='utf-8'?>\n"
+                  '<graphml xmlns="http://graphml.graphdrawing.org/xmlns" '
+                  'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                  'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns '
+                  'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n')
+            for (element, name), (key_id, attr_type) in keys.items():
+                write(f'  <key id="{key_id}" for="{element}" attr.name={quoteattr(name)} attr.type="{attr_type}" />\n')
+            write(f'  <graph edgedefault="{"directed" if self.graph.is_directed() else "undirected"}">\n')
+            for node, data in self.graph.nodes(data=True):
+                write(f'    <node id={quoteattr(str(node))}>{data_elements(data, node_keys)}</node>\n')
+            for source, target, data in self.graph.edges(data=True):
+                write(f'    <edge source={quoteattr(str(source))} target={quoteattr(str(target))}>'
+                      f'{data_elements(data, edge_keys)}</edge>\n')
+            write('  </graph>\n</graphml>\n')
+        
+        return True
+    
+    @staticmethod
+    def _split_edges_by_type(graph: nx.DiGraph) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+        """Split a graph's edges into CI relationship edges and class hierarchy edges."""
+        # Reading just the edge_type attribute avoids materializing each edge's data dict
+        buckets = {'ci': [], 'hierarchy': []}
+        ci_edges = buckets['ci']
+        for source, target, edge_type in graph.edges(data='edge_type', default='ci'):
+            buckets.get(edge_type, ci_edges).append((source, target))
+        return ci_edges, buckets['hierarchy']
+    
+    def _get_largest_component(self) -> Set[str]:
+        """Get the nodes of the graph's largest (weakly) connected component."""
+        if self.graph.is_directed():
+            components = nx.weakly_connected_components(self.graph)
+        else:
+            components = nx.connected_components(self.graph)
+        # max keeps only the largest component seen so far instead of listing
+        # and sorting them all; ties go to the first found, as with a stable sort
+        return max(components, key=len)
+    
+    def _get_scope_node_colors(self, nodes) -> Tuple[List[str], Dict[str, str]]:
+        """Color nodes by scope and package type for the whole-graph drawings.
+        
+        Returns the colors in node order and the legend entries they use.
+        """
+        node_colors = []
+        package_groups = {}  # Track which packages are present for legend
+        styles = {}  # (scope, package source) -> (legend label, color)
+        
+        tables_get = self.tables.get
+        for node in nodes:
+            # Get table package information
+            table_info = tables_get(node, NO_TABLE_INFO)
+            key = (table_info.get('scope', 'unknown'), table_info.get('package', ''))
+            
+            # Tables share a handful of scope/package combinations, so each is
+            # classified only once
+            style = styles.get(key)
+            if style is None:
+                scope, package_source = key
+                if scope == 'global':
+                    style = ('Global Scope', '#4CAF50')  # Green for global
+                elif package_source and package_source != 'global':
+                    # Use different colors for different package types
+                    style = SCOPE_PACKAGE_DEFAULT_STYLE
+                    if package_source.startswith(PACKAGE_STYLE_PREFIXES):
+                        for prefix, legend_label, color in SCOPE_PACKAGE_STYLES:
+                            if package_source.startswith(prefix):
+                                style = (legend_label, color)
+                                break
+                else:
+                    style = ('Other/Unknown', '#2196F3')  # Blue for unknown/other
+                styles[key] = style
+            
+            legend_label, color = style
+            node_colors.append(color)
+            package_groups[legend_label] = color
+        
+        return node_colors, package_groups
+    
     def _export_png_graph(self, output_path: str, max_nodes: int = 100) -> bool:
         """Export the graph as a PNG visualization."""
-        import matplotlib
-        matplotlib.use('Agg')  # Use non-interactive backend
+        plt, patches, _ = _load_matplotlib()
         
         if not self.graph:
             print("Error: No graph available for PNG export.")
             return False
         
+        total_nodes = self.graph.number_of_nodes()
+        
+        # Large graphs are rasterized whole when datashader is installed
+        if total_nodes > max_nodes and DATASHADER_AVAILABLE:
+            return self._export_datashader_graph(output_path)
+        
         # Use a subset if the graph is too large
-        if self.graph.number_of_nodes() > max_nodes:
-            print(f"Graph has {self.graph.number_of_nodes()} nodes. Using largest connected component for PNG export (max {max_nodes} nodes).")
+        if total_nodes > max_nodes:
+            print(f"Graph has {total_nodes} nodes. Using largest connected component for PNG export (max {max_nodes} nodes).")
             
             # Get the largest connected component
-            if self.graph.is_directed():
-                components = list(nx.weakly_connected_components(self.graph))
-            else:
-                components = list(nx.connected_components(self.graph))
-            
-            # Sort by size and take the largest component
-            components.sort(key=len, reverse=True)
-            largest_component = components[0]
+            largest_component = self._get_largest_component()
             
             if len(largest_component) > max_nodes:
-                # Take a subset of the largest component
-                component_nodes = list(largest_component)[:max_nodes]
+                # Take a subset of the largest component without listing all of it
+                component_nodes = frozenset(islice(largest_component, max_nodes))
                 subgraph = self.graph.subgraph(component_nodes)
                 print(f"Using subset of {len(component_nodes)} nodes from largest component")
             else:
@@ -433,51 +882,29 @@ class CMDBGraphBuilder:
                 print(f"Using largest component with {len(largest_component)} nodes")
         else:
             subgraph = self.graph
-            print(f"Exporting complete graph with {self.graph.number_of_nodes()} nodes")
+            print(f"Exporting complete graph with {total_nodes} nodes")
         
         try:
             print("Creating PNG graph visualization...")
             
             # Create figure
             plt.figure(figsize=(16, 12))
-            plt.clf()
             
             # Apply auto layout
-            pos, layout_used = self._apply_layout(subgraph, "auto")
+            pos, layout_used = self._get_layout(subgraph, "auto")
             print(f"Using {layout_used} layout")
             
-            # Draw nodes with colors and sizes
-            node_sizes = []
-            node_colors = []
-            package_groups = {}  # Track which packages are present for legend
-            
-            for node in subgraph.nodes():
-                degree = subgraph.degree(node)
-                node_sizes.append(max(150, min(800, degree * 80)))
-                
-                # Get table package information
-                table_info = self.tables.get(node, {})
-                package_source = table_info.get('package', '')
-                scope = table_info.get('scope', 'unknown')
-                
-                # Determine color based on package/scope
-                if scope == 'global':
-                    node_colors.append('#4CAF50')  # Green for global
-                    package_groups['Global Scope'] = '#4CAF50'
-                elif package_source and package_source != 'global':
-                    # Use different colors for different package types
-                    if package_source.startswith('sn_'):
-                        node_colors.append('#9C27B0')  # Purple for ServiceNow packages
-                        package_groups['ServiceNow Packages'] = '#9C27B0'
-                    elif package_source.startswith('com.'):
-                        node_colors.append('#FF9800')  # Orange for com. packages
-                        package_groups['Plugins/Extensions'] = '#FF9800'
-                    else:
-                        node_colors.append('#607D8B')  # Blue-grey for other packages
-                        package_groups['Other Packages'] = '#607D8B'
-                else:
-                    node_colors.append('#2196F3')  # Blue for unknown/other
-                    package_groups['Other/Unknown'] = '#2196F3'
+            # Draw nodes with colors and sizes; degrees are reused for the
+            # node labels below and come in node order
+            degrees = dict(subgraph.degree())
+            # Subgraph views count their nodes and edges by walking the
+            # underlying graph, so read them once for the whole drawing
+            n_nodes = len(degrees)
+            n_edges = subgraph.number_of_edges()
+            directed = subgraph.is_directed()
+            node_sizes = np.clip(np.fromiter(degrees.values(), dtype=np.int64, count=len(degrees)) * 80,
+                                 150, 800)
+            node_colors, package_groups = self._get_scope_node_colors(degrees)
             
             # Draw the graph
             nx.draw_networkx_nodes(subgraph, pos, 
@@ -486,17 +913,9 @@ class CMDBGraphBuilder:
                                   alpha=0.8)
             
             # Separate edges by type for different styling
-            ci_edges = []
-            hierarchy_edges = []
-            
-            for source, target, data in subgraph.edges(data=True):
-                edge_type = data.get('edge_type', 'ci')
-                if edge_type == 'hierarchy':
-                    hierarchy_edges.append((source, target))
-                else:
-                    ci_edges.append((source, target))
+            ci_edges, hierarchy_edges = self._split_edges_by_type(subgraph)
             
-            if subgraph.is_directed():
+            if directed:
                 # Draw CI relationship edges (solid lines)
                 if ci_edges:
                     nx.draw_networkx_edges(subgraph, pos, 
@@ -526,19 +945,16 @@ class CMDBGraphBuilder:
                                       width=1.5)
             
             # Add labels for important nodes using display labels
-            degrees = dict(subgraph.degree())
-            important_nodes = {}
-            sorted_nodes = sorted(degrees.items(), key=lambda x: x[1], reverse=True)[:20]
-            for node, degree in sorted_nodes:
-                display_label = self.get_table_display_label(node, max_length=15)
-                important_nodes[node] = display_label
+            get_label = self.get_table_display_label
+            important_nodes = {node: get_label(node, max_length=15)
+                               for node, _ in heapq.nlargest(20, degrees.items(), key=itemgetter(1))}
                 
             nx.draw_networkx_labels(subgraph, pos, 
                                    labels=important_nodes,
                                    font_size=8,
                                    font_weight='bold')
             
-            plt.title(f'ServiceNow CMDB Table Relationships\n({subgraph.number_of_nodes()} nodes, {subgraph.number_of_edges()} edges, {layout_used} layout)', 
+            plt.title(f'ServiceNow CMDB Table Relationships\n({n_nodes} nodes, {n_edges} edges, {layout_used} layout)', 
                      fontsize=16, fontweight='bold', pad=20)
             plt.axis('off')
             
@@ -550,9 +966,12 @@ class CMDBGraphBuilder:
             
             plt.tight_layout()
             
-            # Save the PNG
-            plt.savefig(output_path, format='png', dpi=200, bbox_inches='tight', 
-                       facecolor='white', edgecolor='none')
+            # Save the PNG. tight_layout already fits everything, legend included,
+            # inside the figure, so the extra render pass of bbox_inches='tight'
+            # would only trim the outer margin
+            plt.savefig(output_path, format='png', dpi=200,
+                       facecolor='white', edgecolor='none',
+                       pil_kwargs={'compress_level': PNG_COMPRESS_LEVEL})
             plt.close()
             
             print(f"PNG graph visualization saved to: {output_path}")
@@ -565,6 +984,51 @@ class CMDBGraphBuilder:
             return False
     
     
+    def _export_datashader_graph(self, output_path: str, width: int = 1600, height: int = 1200) -> bool:
+        """Export the complete graph as a PNG rasterized with datashader."""
+        try:
+            import pandas as pd
+            import datashader as ds
+            import datashader.transfer_functions as tf
+            from datashader.bundling import connect_edges
+            
+            print(f"Rasterizing complete graph with {self.graph.number_of_nodes()} nodes using datashader...")
+            
+            pos, layout_used = self._get_layout(self.graph, "forceatlas2" if FORCEATLAS2_AVAILABLE else "spring")
+            print(f"Using {layout_used} layout")
+            
+            nodes = list(self.graph.nodes())
+            coords = np.array([pos[node] for node in nodes], dtype=float)
+            nodes_df = pd.DataFrame({'x': coords[:, 0], 'y': coords[:, 1]}, index=nodes)
+            edges_df = pd.DataFrame(list(self.graph.edges()), columns=['source', 'target'])
+            
+            # Pad the ranges so nodes on the boundary are not clipped
+            min_x, min_y = coords.min(axis=0)
+            max_x, max_y = coords.max(axis=0)
+            pad_x = (max_x - min_x) * 0.05 or 1.0
+            pad_y = (max_y - min_y) * 0.05 or 1.0
+            canvas = ds.Canvas(plot_width=width, plot_height=height,
+                               x_range=(min_x - pad_x, max_x + pad_x),
+                               y_range=(min_y - pad_y, max_y + pad_y))
+            
+            images = []
+            if not edges_df.empty:
+                edge_paths = connect_edges(nodes_df, edges_df)
+                images.append(tf.shade(canvas.line(edge_paths, 'x', 'y', agg=ds.count()),
+                                       cmap=['#BDBDBD', '#424242']))
+            images.append(tf.spread(tf.shade(canvas.points(nodes_df, 'x', 'y', agg=ds.count()),
+                                             cmap=['#2196F3', '#0D47A1']), px=2))
+            
+            img = tf.set_background(tf.stack(*images), 'white')
+            img.to_pil().save(str(output_path), format='PNG')
+            
+            print(f"PNG graph visualization saved to: {output_path}")
+            return True
+            
+        except Exception as e:
+            print(f"Error creating datashader visualization: {e}")
+            return False
+    
     def print_sample_relationships(self, limit: int = 10) -> None:
         """Print a sample of relationships for inspection."""
         print(f"\nSample relationships (first {limit}):")
@@ -625,135 +1089,276 @@ class CMDBGraphBuilder:
         # Create new graph centered on the table
         centered_graph = nx.DiGraph()
         
+        # The graph's views are used in every loop below, so bind them once
+        graph_nodes = self.graph.nodes
+        graph_succ = self.graph.succ
+        graph_pred = self.graph.pred
+        
         # Add the central table
-        centered_graph.add_node(table_name, **self.graph.nodes[table_name])
+        centered_graph.add_node(table_name, **graph_nodes[table_name])
+        
+        # We are the only writer of centered_graph, so a plain set of the nodes
+        # added so far answers membership without going through the graph
+        added_nodes = {table_name}
         
         # Get inheritance chain for the target table to find inherited relationships
         applicable_tables = self.find_inherited_relationships(table_name)
         
+        # Only edges touching the table or one of its ancestors qualify, so
+        # collect them from the adjacency of those tables instead of scanning
+        # every edge. Walking the chain in order keeps the result deterministic.
+        matching_edges = []
+        seen_edges = set()
+        for matching_table in self.get_table_inheritance_chain(table_name):
+            if matching_table not in applicable_tables:
+                continue
+            for target, data in graph_succ[matching_table].items():
+                # An edge between two ancestors is reached from both ends
+                if (matching_table, target) not in seen_edges:
+                    seen_edges.add((matching_table, target))
+                    matching_edges.append((matching_table, target, data))
+            for source, data in graph_pred[matching_table].items():
+                if (source, matching_table) not in seen_edges:
+                    seen_edges.add((source, matching_table))
+                    matching_edges.append((source, matching_table, data))
+        
         # Add direct relationships (depth 1) including inherited ones
-        for source, target, data in self.graph.edges(data=True):
-            # Check if this edge involves the target table or any of its ancestors
-            source_matches = source == table_name or source in applicable_tables
-            target_matches = target == table_name or target in applicable_tables
-            
-            if source_matches or target_matches:
-                # Add nodes if they don't exist
-                if source not in centered_graph:
-                    # If this is an inherited relationship, note the original target table
-                    source_attrs = dict(self.graph.nodes[source])
-                    if source in applicable_tables and source != table_name:
-                        source_attrs['inherited_from'] = source
-                        source_attrs['target_table'] = table_name
-                    centered_graph.add_node(source, **source_attrs)
-                    
-                if target not in centered_graph:
-                    # If this is an inherited relationship, note the original target table
-                    target_attrs = dict(self.graph.nodes[target])
-                    if target in applicable_tables and target != table_name:
-                        target_attrs['inherited_from'] = target
-                        target_attrs['target_table'] = table_name
-                    centered_graph.add_node(target, **target_attrs)
+        for source, target, data in matching_edges:
+            # Add nodes if they don't exist
+            # Attributes are only copied when inheritance information is added;
+            # otherwise they are passed through and copied by NetworkX alone
+            source_inherited = source in applicable_tables and source != table_name
+            target_inherited = target in applicable_tables and target != table_name
+            
+            if source not in added_nodes:
+                # If this is an inherited relationship, note the original target table
+                if source_inherited:
+                    source_attrs = {**graph_nodes[source], 'inherited_from': source, 'target_table': table_name}
+                else:
+                    source_attrs = graph_nodes[source]
+                centered_graph.add_node(source, **source_attrs)
+                added_nodes.add(source)
                 
-                # Add edge with inheritance information
+            if target not in added_nodes:
+                # If this is an inherited relationship, note the original target table
+                if target_inherited:
+                    target_attrs = {**graph_nodes[target], 'inherited_from': target, 'target_table': table_name}
+                else:
+                    target_attrs = graph_nodes[target]
+                centered_graph.add_node(target, **target_attrs)
+                added_nodes.add(target)
+            
+            # Add edge with inheritance information
+            if source_inherited or target_inherited:
                 edge_attrs = dict(data)
-                if source in applicable_tables and source != table_name:
+                if source_inherited:
                     edge_attrs['inherited_from_source'] = source
-                    edge_attrs['target_table'] = table_name
-                if target in applicable_tables and target != table_name:
+                if target_inherited:
                     edge_attrs['inherited_from_target'] = target
-                    edge_attrs['target_table'] = table_name
-                    
-                centered_graph.add_edge(source, target, **edge_attrs)
+                edge_attrs['target_table'] = table_name
+            else:
+                edge_attrs = data
+                
+            centered_graph.add_edge(source, target, **edge_attrs)
         
         # Add indirect relationships (depth 2) if requested
         if max_depth > 1:
-            direct_neighbors = set(centered_graph.nodes()) - {table_name}
+            # Count nodes locally instead of asking the graph on every edge
+            node_count = len(added_nodes)
+            direct_neighbors = added_nodes - {table_name}
             for neighbor in list(direct_neighbors):
-                for source, target, data in self.graph.edges(data=True):
-                    # Only add edges that connect to our existing graph
-                    # Either: neighbor -> new_node or new_node -> neighbor
-                    if source == neighbor and target not in centered_graph:
+                if node_count >= 20:
+                    break
+                
+                # Only add edges that connect to our existing graph; the
+                # adjacency views give just the edges touching this neighbor
+                for target, data in graph_succ[neighbor].items():
+                    if node_count >= 20:
+                        break
+                    if target not in added_nodes:
                         # neighbor points to a new node
-                        if centered_graph.number_of_nodes() < 20:
-                            centered_graph.add_node(target, **self.graph.nodes[target])
-                            centered_graph.add_edge(source, target, **data)
-                    elif target == neighbor and source not in centered_graph:
+                        centered_graph.add_node(target, **graph_nodes[target])
+                        added_nodes.add(target)
+                        centered_graph.add_edge(neighbor, target, **data)
+                        node_count += 1
+                
+                for source, data in graph_pred[neighbor].items():
+                    if node_count >= 20:
+                        break
+                    if source not in added_nodes:
                         # new node points to neighbor
-                        if centered_graph.number_of_nodes() < 20:
-                            centered_graph.add_node(source, **self.graph.nodes[source])
-                            centered_graph.add_edge(source, target, **data)
+                        centered_graph.add_node(source, **graph_nodes[source])
+                        added_nodes.add(source)
+                        centered_graph.add_edge(source, neighbor, **data)
+                        node_count += 1
         
         return centered_graph
     
+    def has_path_between_tables(self, source_table: str, target_table: str) -> bool:
+        """Check whether the target table, or one of its ancestors, is reachable from the source table."""
+        if source_table not in self.graph:
+            return False
+        
+        # Paths to any ancestor count, since find_all_paths_between_tables
+        # extends them to the target through inheritance
+        goals = set(self.get_table_inheritance_chain(target_table))
+        
+        # Plain breadth-first search; stops as soon as a goal is reached
+        graph_succ = self.graph.succ
+        visited = {source_table}
+        queue = deque([source_table])
+        while queue:
+            node = queue.popleft()
+            if node in goals:
+                return True
+            for successor in graph_succ[node]:
+                if successor not in visited:
+                    visited.add(successor)
+                    queue.append(successor)
+        
+        return False
+    
+    def _iter_paths_of_length(self, source_table: str, target_table: str, length: int,
+                              distances: Dict[str, int]) -> Iterator[List[str]]:
+        """Yield the simple paths with exactly `length` edges between two tables.
+        
+        Paths come in the same order as nx.all_simple_paths finds them. `distances`
+        holds each table's distance to target_table and prunes branches that
+        cannot reach it in the remaining number of steps.
+        """
+        graph_succ = self.graph.succ
+        path = [source_table]
+        on_path = {source_table}
+        
+        def extend():
+            remaining = length - len(path) + 1
+            node = path[-1]
+            if node == target_table:
+                if remaining == 0:
+                    yield list(path)
+                return
+            for neighbor in graph_succ[node]:
+                if neighbor in on_path or distances.get(neighbor, remaining) >= remaining:
+                    continue
+                path.append(neighbor)
+                on_path.add(neighbor)
+                yield from extend()
+                path.pop()
+                on_path.discard(neighbor)
+        
+        if distances.get(source_table, length + 1) <= length:
+            yield from extend()
+    
+    def _iter_paths_to_any(self, source_table: str, target_tables: Set[str], length: int,
+                           distances: Dict[str, int]) -> Iterator[Tuple[List[str], str]]:
+        """Yield (path, table) for the simple paths with exactly `length` edges ending at any of `target_tables`.
+        
+        A single traversal covers every target; the paths ending at one table
+        come in the order _iter_paths_of_length would give them. `distances`
+        holds each table's distance to the nearest of the targets.
+        """
+        graph_succ = self.graph.succ
+        path = [source_table]
+        on_path = {source_table}
+        
+        def extend():
+            remaining = length - len(path) + 1
+            node = path[-1]
+            if remaining == 0:
+                if node in target_tables:
+                    yield list(path), node
+                return
+            for neighbor in graph_succ[node]:
+                if neighbor in on_path or distances.get(neighbor, remaining) >= remaining:
+                    continue
+                path.append(neighbor)
+                on_path.add(neighbor)
+                yield from extend()
+                path.pop()
+                on_path.discard(neighbor)
+        
+        if distances.get(source_table, length + 1) <= length:
+            yield from extend()
+    
     def find_all_paths_between_tables(self, source_table: str, target_table: str, max_paths: int = 10, max_path_length: int = 5) -> List[List[str]]:
         """Find all paths between two tables in the graph, including inheritance-based paths."""
         if source_table not in self.graph:
             return []
         
-        all_paths = []
-        
         try:
-            # First, find direct paths to the target table
-            if target_table in self.graph:
-                try:
-                    direct_paths = list(nx.all_simple_paths(self.graph, source_table, target_table, cutoff=max_path_length))
-                    for path in direct_paths:
-                        all_paths.append((path, None))  # (path, no_ancestor)
-                except nx.NetworkXNoPath:
-                    pass
-            
-            # Then find paths through inheritance hierarchy
+            # Direct paths end at the target table, inheritance paths at one of
+            # its ancestors and are then extended to the target
             target_inheritance_chain = self.get_table_inheritance_chain(target_table)
+            goals = [table for table in target_inheritance_chain if table in self.graph]
+            
+            # Distance from every table to each goal, searched backwards from the goal
+            reversed_graph = self.graph.reverse(copy=False)
+            distances = {goal: nx.single_source_shortest_path_length(reversed_graph, goal, cutoff=max_path_length)
+                         for goal in goals}
+            
+            # A goal is reachable within the length limit exactly when the
+            # source appears in its distance map; skip the rest entirely
+            reachable_goals = {goal for goal in goals if source_table in distances[goal]}
+            if not reachable_goals:
+                return []
+            
+            # Ancestors are searched together, pruned by the distance to the nearest one
+            ancestors = [table for table in target_inheritance_chain[1:] if table in reachable_goals]
+            ancestor_set = set(ancestors)
+            ancestor_distances = {}
+            for ancestor_table in ancestors:
+                for table, distance in distances[ancestor_table].items():
+                    if distance < ancestor_distances.get(table, math.inf):
+                        ancestor_distances[table] = distance
             
-            # For each ancestor in the inheritance chain, find paths to it
-            for ancestor_table in target_inheritance_chain[1:]:  # Skip the target table itself (first in chain)
-                if ancestor_table in self.graph:
-                    try:
-                        # Find paths to this ancestor
-                        paths_to_ancestor = list(nx.all_simple_paths(self.graph, source_table, ancestor_table, cutoff=max_path_length))
-                        
-                        for path in paths_to_ancestor:
-                            # Create inheritance path: source -> ... -> ancestor -> target
-                            # We'll represent this as a path to target with inheritance metadata
-                            inheritance_path = path + [target_table]
-                            all_paths.append((inheritance_path, ancestor_table))
-                                
-                    except nx.NetworkXNoPath:
-                        continue
-            
-            # Remove duplicates while preserving order and preferring shorter paths
             unique_paths = []
             seen_paths = set()
-            
-            for path_info in all_paths:
-                path, ancestor = path_info
-                path_tuple = tuple(path)
+            direct_index = {}  # Length of every direct path found so far
+            
+            # Paths are generated shortest first: at each length the direct paths
+            # followed by the inheritance paths in ancestor order, which is the
+            # order the final list is sorted in, so the search stops as soon as
+            # max_paths paths are known instead of enumerating every longer path
+            for path_length in range(1, max_path_length + 3):
+                if target_table in reachable_goals and path_length - 1 <= max_path_length:
+                    for path in self._iter_paths_of_length(source_table, target_table, path_length - 1,
+                                                           distances[target_table]):
+                        path_tuple = tuple(path)
+                        direct_index[path_tuple] = len(path)
+                        seen_paths.add(path_tuple)
+                        unique_paths.append((path, None))  # (path, no_ancestor)
+                        if len(unique_paths) >= max_paths:
+                            return unique_paths
                 
-                # Skip if we've seen this exact path before
-                if path_tuple in seen_paths:
+                if path_length < 2 or not ancestors:
                     continue
-                    
-                # For inheritance paths, check if we already have a better direct path
-                if ancestor:
-                    # Check if there's a direct path with the same or fewer nodes
-                    direct_equivalent = tuple(path[:-1])  # Remove the inherited target
-                    has_better_direct = any(
-                        other_path_info[1] is None and 
-                        tuple(other_path_info[0]) == direct_equivalent and
-                        len(other_path_info[0]) <= len(path)
-                        for other_path_info in all_paths
-                    )
-                    if has_better_direct:
-                        continue
                 
-                seen_paths.add(path_tuple)
-                unique_paths.append(path_info)
-            
-            # Sort by path length (preferring shorter paths) and limit number of paths
-            unique_paths.sort(key=lambda x: (len(x[0]), x[1] is not None))  # Direct paths first, then by length
-            if len(unique_paths) > max_paths:
-                unique_paths = unique_paths[:max_paths]
+                # One traversal finds the paths to every ancestor of the target;
+                # they are then taken in ancestor order
+                ancestor_paths = defaultdict(list)
+                for path, ancestor_table in self._iter_paths_to_any(source_table, ancestor_set, path_length - 2,
+                                                                    ancestor_distances):
+                    ancestor_paths[ancestor_table].append(path)
+                
+                for ancestor_table in ancestors:
+                    for path in ancestor_paths.get(ancestor_table, ()):
+                        # Create inheritance path: source -> ... -> ancestor -> target
+                        # We'll represent this as a path to target with inheritance metadata
+                        inheritance_path = path + [target_table]
+                        path_tuple = tuple(inheritance_path)
+                        
+                        # Skip if we've seen this exact path before
+                        if path_tuple in seen_paths:
+                            continue
+                        
+                        # Skip if there is a direct path with the same or fewer nodes
+                        if direct_index.get(tuple(path), math.inf) <= len(inheritance_path):
+                            continue
+                        
+                        seen_paths.add(path_tuple)
+                        unique_paths.append((inheritance_path, ancestor_table))
+                        if len(unique_paths) >= max_paths:
+                            return unique_paths
             
             return unique_paths
             
@@ -761,13 +1366,23 @@ class CMDBGraphBuilder:
             print(f"Error finding paths: {e}")
             return []
     
-    def create_path_graph_between_tables(self, source_table: str, target_table: str, max_paths: int = 10) -> nx.DiGraph:
+    def compute_paths(self, source_table: str, target_table: str, shortest_path_only: bool = False) -> List[Tuple[List[str], str]]:
+        """Find the paths drawn by visualize_table_graph for a source/target pair."""
+        max_paths = 1 if shortest_path_only else 10
+        return self.find_all_paths_between_tables(source_table, target_table, max_paths)
+    
+    def create_path_graph_between_tables(self, source_table: str, target_table: str, max_paths: int = 10,
+                                         precomputed_paths: List[Tuple[List[str], str]] = None) -> nx.DiGraph:
         """Create a graph showing all paths between two tables."""
         if source_table not in self.graph:
             return None
         
         # Find all paths between the tables (including inheritance-based paths)
-        path_infos = self.find_all_paths_between_tables(source_table, target_table, max_paths)
+        # unless the caller already has them
+        if precomputed_paths is not None:
+            path_infos = precomputed_paths
+        else:
+            path_infos = self.find_all_paths_between_tables(source_table, target_table, max_paths)
         
         if not path_infos:
             print(f"No paths found between '{source_table}' and '{target_table}'")
@@ -776,25 +1391,34 @@ class CMDBGraphBuilder:
         # Create a new graph with all nodes and edges from the paths
         path_graph = nx.DiGraph()
         
+        # Node and edge data is looked up for every node and edge added below
+        graph_nodes = self.graph.nodes
+        graph_succ = self.graph.succ
+        
         # Track which nodes are inheritance targets
         inheritance_targets = {}  # node -> ancestor_table
         
+        # Collect the nodes and edges with their attribute dicts first and add
+        # them in bulk. Unmodified attributes are passed straight through since
+        # NetworkX copies them into the new graph anyway; only the ones that
+        # gain inheritance metadata are copied here.
+        path_nodes = {}
+        path_edges = []
+        
         # Add all nodes from all paths
         for path_info in path_infos:
             path, ancestor_table = path_info
             
             for node in path:
-                if node not in path_graph:
+                if node not in path_nodes:
                     if node == target_table and ancestor_table:
                         # This target node is reached through inheritance
-                        node_attrs = dict(self.graph.nodes[node])
-                        node_attrs['inherited_target'] = True
-                        node_attrs['inherited_from'] = ancestor_table
-                        path_graph.add_node(node, **node_attrs)
+                        path_nodes[node] = {**graph_nodes[node], 'inherited_target': True,
+                                            'inherited_from': ancestor_table}
                         inheritance_targets[node] = ancestor_table
                     else:
                         # Regular node from the graph
-                        path_graph.add_node(node, **self.graph.nodes[node])
+                        path_nodes[node] = graph_nodes[node]
         
         # Add all edges from all paths
         for path_info in path_infos:
@@ -804,27 +1428,97 @@ class CMDBGraphBuilder:
                 source_node = path[i]
                 target_node = path[i + 1]
                 
-                if self.graph.has_edge(source_node, target_node):
+                edge_data = graph_succ[source_node].get(target_node)
+                if edge_data is not None:
                     # Direct edge exists in the graph
-                    edge_data = self.graph.edges[source_node, target_node]
-                    path_graph.add_edge(source_node, target_node, **edge_data)
+                    path_edges.append((source_node, target_node, edge_data))
                 else:
                     # This might be an inheritance-based edge
                     # Check if target_node is the final target and we have ancestor info
                     if target_node == target_table and ancestor_table:
-                        if self.graph.has_edge(source_node, ancestor_table):
-                            edge_data = dict(self.graph.edges[source_node, ancestor_table])
-                            edge_data['inherited_edge'] = True
-                            edge_data['inherited_from'] = ancestor_table
-                            path_graph.add_edge(source_node, target_node, **edge_data)
+                        edge_data = graph_succ[source_node].get(ancestor_table)
+                        if edge_data is not None:
+                            path_edges.append((source_node, target_node,
+                                               {**edge_data, 'inherited_edge': True,
+                                                'inherited_from': ancestor_table}))
         
-        for i, path_info in enumerate(path_infos, 1):
-            path, ancestor_table = path_info
-            path_labels = [self.get_table_display_label(node, max_length=20) for node in path]
-            print(f"Path {i}: {' → '.join(path_labels)}")
+        path_graph.add_nodes_from(path_nodes.items())
+        path_graph.add_edges_from(path_edges)
+        
+        # Paths share most of their tables, so label each table of the path graph
+        # once and print the whole listing in one go
+        node_labels = {node: self.get_table_display_label(node, max_length=20) for node in path_graph}
+        print("\n".join(f"Path {i}: {' → '.join(node_labels[node] for node in path)}"
+                        for i, (path, _) in enumerate(path_infos, 1)))
         
         return path_graph
     
+    def get_layout_cache_file(self, graph: nx.DiGraph, layout: str) -> Path:
+        """Get the layout cache file for a graph's nodes and edges and a layout algorithm."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"v{GRAPH_CACHE_VERSION}:{layout}".encode('utf-8'))
+        digest.update(repr(sorted(graph.nodes())).encode('utf-8'))
+        digest.update(repr(sorted(graph.edges())).encode('utf-8'))
+        return self._get_cache_dir() / f"layout_{digest.hexdigest()}.pkl"
+    
+    def _get_layout(self, graph: nx.DiGraph, layout: str) -> Tuple[dict, str]:
+        """Apply a layout, reusing one already computed for the same nodes and edges.
+        
+        Layouts are remembered for the lifetime of the builder, since many
+        table graphs share the same neighborhood, and on disk when caching
+        is enabled.
+        """
+        memo_key = (layout, frozenset(graph.nodes()), frozenset(graph.edges()))
+        memoized = self._layout_memo.get(memo_key)
+        if memoized is not None:
+            pos, layout_used = memoized
+            return dict(pos), layout_used
+        
+        pos, layout_used = self._load_or_apply_layout(graph, layout)
+        self._layout_memo[memo_key] = (pos, layout_used)
+        return dict(pos), layout_used
+    
+    def _load_or_apply_layout(self, graph: nx.DiGraph, layout: str) -> Tuple[dict, str]:
+        """Apply a layout, reusing a previously computed one when caching is enabled."""
+        if not self.use_cache:
+            return self._apply_layout(graph, layout)
+        
+        cache_file = self.get_layout_cache_file(graph, layout)
+        if cache_file.exists():
+            try:
+                with open(cache_file, 'rb') as f:
+                    return pickle.load(f)
+            except Exception as e:
+                print(f"Warning: Ignoring unreadable layout cache {cache_file}: {e}")
+        
+        pos, layout_used = self._apply_layout(graph, layout)
+        self._write_cache_file(cache_file, (pos, layout_used))
+        return pos, layout_used
+    
+    @staticmethod
+    def _may_be_planar(graph: nx.DiGraph) -> bool:
+        """Check Euler's bound |E| <= 3|V| - 6, which every planar graph meets."""
+        node_count = graph.number_of_nodes()
+        edge_limit = 3 * node_count - 6
+        edge_count = graph.number_of_edges()
+        if node_count < 3 or edge_count <= edge_limit:
+            return True
+        
+        # Planarity concerns the underlying simple graph: self loops do not
+        # count and edges in both directions between two tables count once
+        edge_count -= nx.number_of_selfloops(graph)
+        if graph.is_directed():
+            graph_succ = graph.succ
+            edge_count -= sum(1 for source, target in graph.edges()
+                              if source != target and source in graph_succ[target]) // 2
+        return edge_count <= edge_limit
+    
+    def _planar_layout(self, graph: nx.DiGraph) -> dict:
+        """Planar layout that rejects graphs too dense to be planar without testing them."""
+        if not self._may_be_planar(graph):
+            raise nx.NetworkXException("G is not planar.")
+        return nx.planar_layout(graph, scale=2)
+    
     def _apply_layout(self, graph: nx.DiGraph, layout: str) -> Tuple[dict, str]:
         """Apply the specified layout algorithm to the graph."""
         
@@ -832,7 +1526,7 @@ class CMDBGraphBuilder:
         layout_functions = {
             "spring": lambda g: nx.spring_layout(g, k=max(2, g.number_of_nodes() * 0.15), iterations=100, seed=42),
             "kamada_kawai": lambda g: nx.kamada_kawai_layout(g, scale=max(2, g.number_of_nodes() * 0.2)),
-            "planar": lambda g: nx.planar_layout(g, scale=2),
+            "planar": self._planar_layout,
             "circular": lambda g: nx.circular_layout(g, scale=2),
             "random": lambda g: nx.random_layout(g, seed=42),
             "shell": lambda g: nx.shell_layout(g, scale=2),
@@ -840,10 +1534,22 @@ class CMDBGraphBuilder:
             "spiral": lambda g: nx.spiral_layout(g, scale=2),
             "multipartite": lambda g: nx.multipartite_layout(g, scale=2)
         }
+        if FORCEATLAS2_AVAILABLE:
+            layout_functions["forceatlas2"] = lambda g: nx.rescale_layout_dict(
+                nx.forceatlas2_layout(g, max_iter=100, seed=42), scale=max(2, g.number_of_nodes() * 0.2))
         
         if layout == "auto":
-            # Try layouts in order of preference for CMDB graphs
-            preferred_order = ["planar", "kamada_kawai", "spring", "circular"]
+            # Try layouts in order of preference for CMDB graphs; the second
+            # choice depends on what is still fast at the graph's size
+            node_count = graph.number_of_nodes()
+            if node_count <= KAMADA_KAWAI_MAX_NODES:
+                preferred_order = ["planar", "kamada_kawai", "spring", "circular"]
+            elif FORCEATLAS2_AVAILABLE and node_count < SPECTRAL_MIN_NODES:
+                preferred_order = ["planar", "forceatlas2", "spring", "circular"]
+            else:
+                preferred_order = ["planar", "spectral", "spring", "circular"]
+            if FORCEATLAS2_AVAILABLE and node_count > SPRING_MAX_NODES and "forceatlas2" not in preferred_order:
+                preferred_order.insert(preferred_order.index("spring"), "forceatlas2")
             
             for layout_name in preferred_order:
                 try:
@@ -905,13 +1611,21 @@ class CMDBGraphBuilder:
         return {node: tuple(positions[i]) for i, node in enumerate(nodes)}
     
     def visualize_table_graph(self, table_name: str, output_dir: str = "path_graphs", 
-                             max_depth: int = 2, save_format: str = "png", target_table: str = None, shortest_path_only: bool = False, layout: str = "auto") -> bool:
-        """Create and save a visualization for a specific table's relationships."""
+                             max_depth: int = 2, save_format: str = "png", target_table: str = None, shortest_path_only: bool = False, layout: str = "auto",
+                             precomputed_paths: List[Tuple[List[str], str]] = None, fig=None) -> bool:
+        """Create and save a visualization for a specific table's relationships.
+        
+        When `fig` is given the drawing reuses that matplotlib figure, clearing
+        it first, and leaves it open for the caller instead of creating and
+        closing a new one.
+        """
         
         # If target_table is specified, create a path graph between the two tables
         if target_table:
-            max_paths = 1 if shortest_path_only else 10
-            centered_graph = self.create_path_graph_between_tables(table_name, target_table, max_paths)
+            if precomputed_paths is None:
+                precomputed_paths = self.compute_paths(table_name, target_table, shortest_path_only)
+            centered_graph = self.create_path_graph_between_tables(table_name, target_table,
+                                                                   precomputed_paths=precomputed_paths)
             graph_type = "shortest_path" if shortest_path_only else "path"
         else:
             # Create the table-centered graph
@@ -926,19 +1640,23 @@ class CMDBGraphBuilder:
         output_path.mkdir(exist_ok=True)
         
         # Set matplotlib backend
-        import matplotlib
-        matplotlib.use('Agg')
+        plt, patches, Line2D = _load_matplotlib()
         
         try:
             
             # Create figure with size based on number of nodes
             fig_width = max(12, min(20, 10 + centered_graph.number_of_nodes() * 0.3))
             fig_height = max(8, min(16, 6 + centered_graph.number_of_nodes() * 0.2))
-            plt.figure(figsize=(fig_width, fig_height))
-            plt.clf()
+            if fig is None:
+                plt.figure(figsize=(fig_width, fig_height))
+            else:
+                # A reused figure still holds the previous table's drawing
+                plt.figure(fig.number)
+                fig.set_size_inches(fig_width, fig_height)
+                plt.clf()
             
             # Apply the specified layout
-            pos, layout_used = self._apply_layout(centered_graph, layout)
+            pos, layout_used = self._get_layout(centered_graph, layout)
             
             # Position root node (source table) in upper left for path graphs
             if target_table:
@@ -948,6 +1666,9 @@ class CMDBGraphBuilder:
             node_colors = []
             node_sizes = []
             package_groups = {}  # Track which packages are present for legend
+            package_styles = {}  # package source -> (color, legend label)
+            degrees = dict(centered_graph.degree())
+            tables_get = self.tables.get
             
             for node in centered_graph.nodes():
                 if node == table_name:
@@ -958,7 +1679,7 @@ class CMDBGraphBuilder:
                     node_sizes.append(800)
                 else:
                     # Get table package information
-                    table_info = self.tables.get(node, {})
+                    table_info = tables_get(node, NO_TABLE_INFO)
                     package_source = table_info.get('package', '')
                     scope = table_info.get('scope', 'unknown')
                     
@@ -967,25 +1688,26 @@ class CMDBGraphBuilder:
                         node_colors.append('#4CAF50')  # Green for global
                         package_groups['Global Scope'] = '#4CAF50'
                     elif package_source and package_source != 'global':
-                        # Use different colors for different package types
-                        if package_source.startswith('sn_'):
-                            node_colors.append('#9C27B0')  # Purple for ServiceNow packages
+                        # Use different colors for different package types; tables
+                        # usually share a few packages, so each is styled only once
+                        style = package_styles.get(package_source)
+                        if style is None:
+                            color, prefix_label = PACKAGE_DEFAULT_STYLE
+                            if package_source.startswith(PACKAGE_STYLE_PREFIXES):
+                                for prefix, prefix_color, label in PACKAGE_STYLES:
+                                    if package_source.startswith(prefix):
+                                        color, prefix_label = prefix_color, label
+                                        break
                             package_name = self.get_package_display_name(package_source, max_length=20)
-                            package_groups[f'SN Package ({package_name})'] = '#9C27B0'
-                        elif package_source.startswith('com.'):
-                            node_colors.append('#FF9800')  # Orange for com. packages
-                            package_name = self.get_package_display_name(package_source, max_length=20)
-                            package_groups[f'Plugin ({package_name})'] = '#FF9800'
-                        else:
-                            node_colors.append('#607D8B')  # Blue-grey for other packages
-                            package_name = self.get_package_display_name(package_source, max_length=20)
-                            package_groups[f'Package ({package_name})'] = '#607D8B'
+                            style = package_styles[package_source] = (color, f'{prefix_label} ({package_name})')
+                        color, legend_label = style
+                        node_colors.append(color)
+                        package_groups[legend_label] = color
                     else:
                         node_colors.append('#2196F3')  # Blue for unknown/other
                         package_groups['Other/Unknown'] = '#2196F3'
                     
-                    degree = centered_graph.degree(node)
-                    node_sizes.append(max(300, min(600, degree * 100)))
+                    node_sizes.append(max(300, min(600, degrees[node] * 100)))
             
             # Draw nodes
             nx.draw_networkx_nodes(centered_graph, pos, 
@@ -994,15 +1716,7 @@ class CMDBGraphBuilder:
                                   alpha=0.8)
             
             # Separate edges by type for different styling
-            ci_edges = []
-            hierarchy_edges = []
-            
-            for source, target, data in centered_graph.edges(data=True):
-                edge_type = data.get('edge_type', 'ci')
-                if edge_type == 'hierarchy':
-                    hierarchy_edges.append((source, target))
-                else:
-                    ci_edges.append((source, target))
+            ci_edges, hierarchy_edges = self._split_edges_by_type(centered_graph)
             
             # Draw CI relationship edges (solid lines)
             if ci_edges:
@@ -1037,26 +1751,25 @@ class CMDBGraphBuilder:
             
             # Draw node labels using human-readable labels with better positioning
             node_labels = {}
-            for node in centered_graph.nodes():
-                node_attrs = centered_graph.nodes[node]
-                
+            get_label = self.get_table_display_label
+            for node, node_attrs in centered_graph.nodes(data=True):
                 # Check if this is an inherited relationship or inherited target
                 if target_table is None and 'target_table' in node_attrs and 'inherited_from' in node_attrs:
                     # Show target table name with actual table in parentheses (for single table graphs)
                     target_table_name = node_attrs['target_table']
                     inherited_from = node_attrs['inherited_from']
-                    target_display = self.get_table_display_label(target_table_name, max_length=15)
-                    inherited_display = self.get_table_display_label(inherited_from, max_length=15)
+                    target_display = get_label(target_table_name, max_length=15)
+                    inherited_display = get_label(inherited_from, max_length=15)
                     display_label = f"{target_display} ({inherited_display})"
                 elif 'inherited_target' in node_attrs and 'inherited_from' in node_attrs:
                     # Show target table name with inherited ancestor in parentheses (for path graphs)
                     inherited_from = node_attrs['inherited_from']
-                    target_display = self.get_table_display_label(node, max_length=15)
-                    inherited_display = self.get_table_display_label(inherited_from, max_length=15)
+                    target_display = get_label(node, max_length=15)
+                    inherited_display = get_label(inherited_from, max_length=15)
                     display_label = f"{target_display} ({inherited_display})"
                 else:
                     # Use human-readable label from sys_db_object.json
-                    display_label = self.get_table_display_label(node, max_length=20)
+                    display_label = get_label(node, max_length=20)
                     
                 node_labels[node] = display_label
             
@@ -1123,18 +1836,15 @@ class CMDBGraphBuilder:
             
             # Add edge type legend if we have both types
             if ci_edges and hierarchy_edges:
-                from matplotlib.lines import Line2D
                 legend_elements.extend([
                     Line2D([0], [0], color='gray', linewidth=2, label='CI Relationships'),
                     Line2D([0], [0], color='blue', linewidth=1.5, linestyle='dotted', label='Class Hierarchy')
                 ])
             elif hierarchy_edges:
-                from matplotlib.lines import Line2D
                 legend_elements.append(
                     Line2D([0], [0], color='blue', linewidth=1.5, linestyle='dotted', label='Class Hierarchy')
                 )
             elif ci_edges:
-                from matplotlib.lines import Line2D
                 legend_elements.append(
                     Line2D([0], [0], color='gray', linewidth=2, label='CI Relationships')
                 )
@@ -1158,9 +1868,12 @@ class CMDBGraphBuilder:
                     output_file = output_path / f"{table_name}_to_{target_table}_paths{layout_suffix}.{save_format}"
             else:
                 output_file = output_path / f"{table_name}{layout_suffix}.{save_format}"
+            # pil_kwargs is only understood by the raster writers
+            png_options = {'pil_kwargs': {'compress_level': PNG_COMPRESS_LEVEL}} if save_format == 'png' else {}
             plt.savefig(output_file, format=save_format, dpi=200, bbox_inches='tight', 
-                       facecolor='white', edgecolor='none')
-            plt.close()
+                       facecolor='white', edgecolor='none', **png_options)
+            if fig is None:
+                plt.close()
             
             return True
             
@@ -1168,50 +1881,93 @@ class CMDBGraphBuilder:
             import traceback
             print(f"Error creating graph for {table_name}: {e}")
             print(f"Error details: {traceback.format_exc()}")
-            plt.close()
+            if fig is None:
+                plt.close()
             return False
     
     def generate_all_table_graphs(self, output_dir: str = "table_graphs", 
-                                 max_tables: int = None, min_relationships: int = 1) -> int:
-        """Generate individual graphs for all tables (or top N tables)."""
+                                 max_tables: int = None, min_relationships: int = 1, jobs: int = 1) -> int:
+        """Generate individual graphs for all tables (or top N tables).
+        
+        With `jobs` above 1 (or 0 for one per CPU) the graphs are rendered by
+        that many worker processes.
+        """
         if not self.graph:
             print("Error: No graph available. Please build the graph first.")
             return 0
         
         # Get tables with their relationship counts
         table_relationships = {}
-        for node in self.graph.nodes():
-            total_rels = self.graph.in_degree(node) + self.graph.out_degree(node)
+        for node, total_rels in self.graph.degree():
             if total_rels >= min_relationships:
                 table_relationships[node] = total_rels
         
-        # Sort by relationship count
-        sorted_tables = sorted(table_relationships.items(), key=lambda x: x[1], reverse=True)
-        
-        # Limit number of tables if specified
+        # Sort by relationship count; when only the top tables are wanted,
+        # nlargest gives the same order without sorting every table
         if max_tables:
-            sorted_tables = sorted_tables[:max_tables]
+            sorted_tables = heapq.nlargest(max_tables, table_relationships.items(), key=itemgetter(1))
+        else:
+            sorted_tables = sorted(table_relationships.items(), key=itemgetter(1), reverse=True)
         
         print(f"Generating individual graphs for {len(sorted_tables)} tables...")
         print(f"Output directory: {self.base_path / output_dir}")
         
+        jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        if jobs > 1 and len(sorted_tables) > 1:
+            return self._generate_table_graphs_parallel(sorted_tables, output_dir, jobs)
+        
+        # Every graph is drawn on the same figure rather than a new one each
+        plt, _, _ = _load_matplotlib()
+        fig = plt.figure()
+        
+        successful = 0
+        try:
+            for i, (table_name, rel_count) in enumerate(sorted_tables, 1):
+                display_label = self.get_table_display_label(table_name, max_length=40)
+                print(f"\n{i:3d}/{len(sorted_tables)}: {display_label} ({rel_count} relationships)")
+                if self.visualize_table_graph(table_name, output_dir, fig=fig):
+                    successful += 1
+        finally:
+            plt.close(fig)
+        
+        print(f"\nCompleted: {successful}/{len(sorted_tables)} graphs generated successfully")
+        return successful
+    
+    def _generate_table_graphs_parallel(self, sorted_tables: List[Tuple[str, int]], output_dir: str,
+                                        jobs: int) -> int:
+        """Render table graphs in worker processes for generate_all_table_graphs."""
+        # The graphs are independent once the graph is built, so the builder is
+        # shipped to each worker once and every worker draws on its own figure
         successful = 0
-        for i, (table_name, rel_count) in enumerate(sorted_tables, 1):
-            display_label = self.get_table_display_label(table_name, max_length=40)
-            print(f"\n{i:3d}/{len(sorted_tables)}: {display_label} ({rel_count} relationships)")
-            if self.visualize_table_graph(table_name, output_dir):
-                successful += 1
+        with ProcessPoolExecutor(max_workers=min(jobs, len(sorted_tables)),
+                                 initializer=_init_render_worker,
+                                 initargs=(self,)) as executor:
+            futures = [executor.submit(_render_table_graph, table_name, output_dir)
+                       for table_name, _ in sorted_tables]
+            for i, ((table_name, rel_count), future) in enumerate(zip(sorted_tables, futures), 1):
+                display_label = self.get_table_display_label(table_name, max_length=40)
+                print(f"\n{i:3d}/{len(sorted_tables)}: {display_label} ({rel_count} relationships)")
+                if future.result():
+                    successful += 1
         
         print(f"\nCompleted: {successful}/{len(sorted_tables)} graphs generated successfully")
         return successful
     
     def view_graph_interactive(self, max_nodes: int = 100) -> bool:
         """Launch an interactive viewer for the graph using networkx-viewer."""
-        if not NETWORKX_VIEWER_AVAILABLE:
+        # networkx-viewer pulls in tkinter, so it is only imported when needed
+        try:
+            from networkx_viewer import Viewer
+            viewer_error = None
+        except ImportError as e:
+            Viewer = None
+            viewer_error = str(e)
+        
+        if Viewer is None:
             print("Error: networkx-viewer is not available.")
-            if NETWORKX_VIEWER_ERROR:
-                print(f"Import error: {NETWORKX_VIEWER_ERROR}")
-            if "_tkinter" in str(NETWORKX_VIEWER_ERROR):
+            if viewer_error:
+                print(f"Import error: {viewer_error}")
+            if "_tkinter" in str(viewer_error):
                 print("\nThis appears to be a tkinter issue (interactive viewing not available).")
                 print("Alternatives:")
                 print("  1. Export to GEXF and use Gephi: python main.py --export-format gexf")
@@ -1235,23 +1991,18 @@ class CMDBGraphBuilder:
             print("Error: No graph available. Please build the graph first.")
             return False
         
+        total_nodes = self.graph.number_of_nodes()
+        
         # Use a subset if the graph is too large
-        if self.graph.number_of_nodes() > max_nodes:
-            print(f"Graph has {self.graph.number_of_nodes()} nodes. Using largest connected component for viewing (max {max_nodes} nodes).")
+        if total_nodes > max_nodes:
+            print(f"Graph has {total_nodes} nodes. Using largest connected component for viewing (max {max_nodes} nodes).")
             
             # Get the largest connected component
-            if self.graph.is_directed():
-                components = list(nx.weakly_connected_components(self.graph))
-            else:
-                components = list(nx.connected_components(self.graph))
-            
-            # Sort by size and take the largest component
-            components.sort(key=len, reverse=True)
-            largest_component = components[0]
+            largest_component = self._get_largest_component()
             
             if len(largest_component) > max_nodes:
-                # Take a subset of the largest component
-                component_nodes = list(largest_component)[:max_nodes]
+                # Take a subset of the largest component without listing all of it
+                component_nodes = frozenset(islice(largest_component, max_nodes))
                 subgraph = self.graph.subgraph(component_nodes)
                 print(f"Viewing subset of {len(component_nodes)} nodes from largest component")
             else:
@@ -1259,7 +2010,7 @@ class CMDBGraphBuilder:
                 print(f"Viewing largest component with {len(largest_component)} nodes")
         else:
             subgraph = self.graph
-            print(f"Viewing complete graph with {self.graph.number_of_nodes()} nodes")
+            print(f"Viewing complete graph with {total_nodes} nodes")
         
         try:
             print("Launching interactive graph viewer...")
@@ -1282,30 +2033,24 @@ class CMDBGraphBuilder:
     def view_graph_matplotlib(self, max_nodes: int = 100) -> bool:
         """Create a matplotlib visualization and save as image for viewing."""
         # Don't try to use interactive backend if tkinter isn't available
-        import matplotlib
-        matplotlib.use('Agg')  # Use non-interactive backend
+        plt, patches, _ = _load_matplotlib()
         
         if not self.graph:
             print("Error: No graph available. Please build the graph first.")
             return False
         
+        total_nodes = self.graph.number_of_nodes()
+        
         # Use a subset if the graph is too large
-        if self.graph.number_of_nodes() > max_nodes:
-            print(f"Graph has {self.graph.number_of_nodes()} nodes. Using largest connected component for viewing (max {max_nodes} nodes).")
+        if total_nodes > max_nodes:
+            print(f"Graph has {total_nodes} nodes. Using largest connected component for viewing (max {max_nodes} nodes).")
             
             # Get the largest connected component
-            if self.graph.is_directed():
-                components = list(nx.weakly_connected_components(self.graph))
-            else:
-                components = list(nx.connected_components(self.graph))
-            
-            # Sort by size and take the largest component
-            components.sort(key=len, reverse=True)
-            largest_component = components[0]
+            largest_component = self._get_largest_component()
             
             if len(largest_component) > max_nodes:
-                # Take a subset of the largest component
-                component_nodes = list(largest_component)[:max_nodes]
+                # Take a subset of the largest component without listing all of it
+                component_nodes = frozenset(islice(largest_component, max_nodes))
                 subgraph = self.graph.subgraph(component_nodes)
                 print(f"Viewing subset of {len(component_nodes)} nodes from largest component")
             else:
@@ -1313,7 +2058,7 @@ class CMDBGraphBuilder:
                 print(f"Viewing largest component with {len(largest_component)} nodes")
         else:
             subgraph = self.graph
-            print(f"Viewing complete graph with {self.graph.number_of_nodes()} nodes")
+            print(f"Viewing complete graph with {total_nodes} nodes")
         
         try:
             print("Creating matplotlib graph visualization...")
@@ -1321,44 +2066,22 @@ class CMDBGraphBuilder:
             
             # Create interactive plot
             plt.figure(figsize=(14, 10))
-            plt.clf()
             
             # Apply auto layout
-            pos, layout_used = self._apply_layout(subgraph, "auto")
+            pos, layout_used = self._get_layout(subgraph, "auto")
             print(f"Using {layout_used} layout")
             
-            # Draw nodes with colors and sizes
-            node_sizes = []
-            node_colors = []
-            package_groups = {}  # Track which packages are present for legend
-            
-            for node in subgraph.nodes():
-                degree = subgraph.degree(node)
-                node_sizes.append(max(100, min(1000, degree * 50)))
-                
-                # Get table package information
-                table_info = self.tables.get(node, {})
-                package_source = table_info.get('package', '')
-                scope = table_info.get('scope', 'unknown')
-                
-                # Determine color based on package/scope
-                if scope == 'global':
-                    node_colors.append('#4CAF50')  # Green for global
-                    package_groups['Global Scope'] = '#4CAF50'
-                elif package_source and package_source != 'global':
-                    # Use different colors for different package types
-                    if package_source.startswith('sn_'):
-                        node_colors.append('#9C27B0')  # Purple for ServiceNow packages
-                        package_groups['ServiceNow Packages'] = '#9C27B0'
-                    elif package_source.startswith('com.'):
-                        node_colors.append('#FF9800')  # Orange for com. packages
-                        package_groups['Plugins/Extensions'] = '#FF9800'
-                    else:
-                        node_colors.append('#607D8B')  # Blue-grey for other packages
-                        package_groups['Other Packages'] = '#607D8B'
-                else:
-                    node_colors.append('#2196F3')  # Blue for unknown/other
-                    package_groups['Other/Unknown'] = '#2196F3'
+            # Draw nodes with colors and sizes; degrees are reused for the
+            # node labels below and come in node order
+            degrees = dict(subgraph.degree())
+            # Subgraph views count their nodes and edges by walking the
+            # underlying graph, so read them once for the whole drawing
+            n_nodes = len(degrees)
+            n_edges = subgraph.number_of_edges()
+            directed = subgraph.is_directed()
+            node_sizes = np.clip(np.fromiter(degrees.values(), dtype=np.int64, count=len(degrees)) * 50,
+                                 100, 1000)
+            node_colors, package_groups = self._get_scope_node_colors(degrees)
             
             # Draw the graph
             nx.draw_networkx_nodes(subgraph, pos, 
@@ -1366,7 +2089,7 @@ class CMDBGraphBuilder:
                                   node_size=node_sizes,
                                   alpha=0.8)
             
-            if subgraph.is_directed():
+            if directed:
                 nx.draw_networkx_edges(subgraph, pos, 
                                       edge_color='gray', 
                                       arrows=True, 
@@ -1380,19 +2103,16 @@ class CMDBGraphBuilder:
                                       width=1)
             
             # Add labels for important nodes using display labels
-            degrees = dict(subgraph.degree())
-            important_nodes = {}
-            sorted_nodes = sorted(degrees.items(), key=lambda x: x[1], reverse=True)[:15]
-            for node, degree in sorted_nodes:
-                display_label = self.get_table_display_label(node, max_length=20)
-                important_nodes[node] = display_label
+            get_label = self.get_table_display_label
+            important_nodes = {node: get_label(node, max_length=20)
+                               for node, _ in heapq.nlargest(15, degrees.items(), key=itemgetter(1))}
                 
             nx.draw_networkx_labels(subgraph, pos, 
                                    labels=important_nodes,
                                    font_size=8,
                                    font_weight='bold')
             
-            plt.title(f'ServiceNow CMDB Table Relationships\n({subgraph.number_of_nodes()} nodes, {subgraph.number_of_edges()} edges)', 
+            plt.title(f'ServiceNow CMDB Table Relationships\n({n_nodes} nodes, {n_edges} edges)', 
                      fontsize=14, fontweight='bold')
             plt.axis('off')
             
@@ -1406,8 +2126,10 @@ class CMDBGraphBuilder:
             
             # Save the image instead of showing interactively
             output_file = self.base_path / "cmdb_graph_view.png"
-            plt.savefig(output_file, dpi=150, bbox_inches='tight', 
-                       facecolor='white', edgecolor='none')
+            # The legend sits inside the axes, so no bbox_inches='tight' pass is needed
+            plt.savefig(output_file, dpi=150,
+                       facecolor='white', edgecolor='none',
+                       pil_kwargs={'compress_level': PNG_COMPRESS_LEVEL})
             plt.close()
             
             print(f"Graph visualization saved to: {output_file}")
@@ -1418,54 +2140,3 @@ class CMDBGraphBuilder:
         except Exception as e:
             print(f"Error launching matplotlib viewer: {e}")
             return False
-
-
-def main():
-    """Main function to demonstrate usage."""
-    # Initialize the graph builder
-    builder = CMDBGraphBuilder()
-    
-    # Build the graph
-    graph = builder.build_graph()
-    
-    # Print statistics
-    stats = builder.get_graph_statistics()
-    print(f"\nDetailed Statistics:")
-    for key, value in stats.items():
-        if key == 'top_central_nodes':
-            print(f"  Top 5 most connected tables:")
-            for i, (node, centrality) in enumerate(value[:5]):
-                print(f"    {i+1}. {node} (centrality: {centrality:.4f})")
-        else:
-            print(f"  {key}: {value}")
-    
-    # Show sample relationships
-    builder.print_sample_relationships()
-    
-    # Export graph in multiple formats
-    print("\nExporting graph...")
-    builder.export_graph("gexf")
-    builder.export_graph("json")
-    
-    # Example: Find relationships for a specific table
-    print("\nExample: Relationships for 'cmdb_ci_server':")
-    server_rels = builder.find_table_relationships('cmdb_ci_server')
-    if 'error' not in server_rels:
-        print(f"  Incoming: {server_rels['total_incoming']} relationships")
-        print(f"  Outgoing: {server_rels['total_outgoing']} relationships")
-        
-        if server_rels['incoming_relationships']:
-            print("  Sample incoming relationships:")
-            for rel in server_rels['incoming_relationships'][:3]:
-                print(f"    {rel['source']} --[{rel['relationship']}]--> cmdb_ci_server")
-        
-        if server_rels['outgoing_relationships']:
-            print("  Sample outgoing relationships:")
-            for rel in server_rels['outgoing_relationships'][:3]:
-                print(f"    cmdb_ci_server --[{rel['relationship']}]--> {rel['target']}")
-    else:
-        print(f"  {server_rels['error']}")
-
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
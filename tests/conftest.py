@@ -2,51 +2,81 @@
 Pytest configuration and shared fixtures.
 """
 
+import copy
+import os
 import pytest
-import tempfile
 import shutil
 from pathlib import Path
 
+# Use the non-interactive backend; set before anything imports matplotlib so
+# that no test has to switch backends (subprocesses inherit it as well)
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+# The test exports are fixed, so they are listed once at import
+TEST_DATA_DIR = Path(__file__).parent / "data"
+TEST_JSON_FILES = tuple(TEST_DATA_DIR.glob("*.json"))
+
+
+def _copy_test_data(directory):
+    """Copy the test exports into directory and return it."""
+    for json_file in TEST_JSON_FILES:
+        shutil.copyfile(json_file, directory / json_file.name)
+    return directory
+
 
 @pytest.fixture(scope="session")
 def test_data_path():
     """Get the path to test data directory."""
-    return Path(__file__).parent / "data"
+    return TEST_DATA_DIR
 
 
 @pytest.fixture
-def temp_data_dir(test_data_path):
+def temp_data_dir(tmp_path):
     """Create a temporary directory with test data for each test."""
-    # Create a temporary directory
-    temp_dir = tempfile.mkdtemp()
-    temp_path = Path(temp_dir)
-    
-    # Copy test data files to temp directory
-    for json_file in test_data_path.glob("*.json"):
-        shutil.copy(json_file, temp_path / json_file.name)
-    
-    yield temp_path
-    
-    # Cleanup
-    shutil.rmtree(temp_dir)
-
-
-# Configure pytest to ignore matplotlib UserWarnings during tests
-@pytest.fixture(autouse=True)
-def configure_matplotlib():
-    """Configure matplotlib for testing."""
-    import matplotlib
-    matplotlib.use('Agg')  # Use non-interactive backend
-    
-    # Suppress matplotlib warnings during tests
-    import warnings
-    warnings.filterwarnings("ignore", category=UserWarning, module="matplotlib")
-    warnings.filterwarnings("ignore", category=DeprecationWarning, module="matplotlib")
-
-
-# Set up test markers
-def pytest_configure(config):
-    """Configure pytest markers."""
-    config.addinivalue_line("markers", "integration: mark test as integration test")
-    config.addinivalue_line("markers", "slow: mark test as slow running")
-    config.addinivalue_line("markers", "cli: mark test as CLI test")
\ No newline at end of file
+    # Tests rewrite these files in place, so each test gets real copies rather
+    # than hard links back to tests/data; pytest's tmp_path handles cleanup
+    return _copy_test_data(tmp_path)
+
+
+@pytest.fixture(scope="session")
+def prebuilt_builder(tmp_path_factory):
+    """Graph builder with the test data graph built once for read-only tests.
+
+    Tests that change the graph, tables or data files must use their own
+    builder instead.
+    """
+    from sn_cmdb_map.graph_builder import CMDBGraphBuilder
+
+    data_dir = _copy_test_data(tmp_path_factory.mktemp("cmdb_data"))
+    builder = CMDBGraphBuilder(data_dir=str(data_dir))
+    builder.build_graph()
+    return builder
+
+
+@pytest.fixture(scope="session")
+def loaded_builder_seed(tmp_path_factory):
+    """Graph builder with the table, relationship type and package metadata loaded once."""
+    from sn_cmdb_map.graph_builder import CMDBGraphBuilder
+
+    data_dir = _copy_test_data(tmp_path_factory.mktemp("cmdb_seed"))
+    builder = CMDBGraphBuilder(data_dir=str(data_dir))
+    builder.load_tables()
+    builder.load_relationship_types()
+    builder.load_packages()
+    return builder
+
+
+@pytest.fixture
+def loaded_builder(loaded_builder_seed):
+    """Private copy of loaded_builder_seed that a test may change freely.
+
+    Copying the loaded state is several times cheaper than loading it
+    again. The copy still reads the seed's data directory, so tests that
+    rewrite data files must use their own builder.
+    """
+    from sn_cmdb_map.graph_builder import CMDBGraphBuilder
+
+    builder = CMDBGraphBuilder.__new__(CMDBGraphBuilder)
+    builder.__dict__ = copy.deepcopy(loaded_builder_seed.__dict__)
+    return builder
+
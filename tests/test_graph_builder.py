@@ -2,11 +2,10 @@
 Unit tests for the CMDBGraphBuilder class.
 """
 
+import json
 import pytest
-import tempfile
-import shutil
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import DEFAULT, patch, MagicMock
 import networkx as nx
 
 from sn_cmdb_map.graph_builder import CMDBGraphBuilder
@@ -16,34 +15,15 @@ class TestCMDBGraphBuilder:
     """Test cases for CMDBGraphBuilder class."""
 
     @pytest.fixture
-    def test_data_dir(self):
-        """Create a temporary directory with test data."""
-        # Get the test data directory
-        test_dir = Path(__file__).parent / "data"
-        
-        # Create a temporary directory
-        temp_dir = tempfile.mkdtemp()
-        temp_path = Path(temp_dir)
-        
-        # Copy test data files to temp directory
-        for json_file in test_dir.glob("*.json"):
-            shutil.copy(json_file, temp_path / json_file.name)
-        
-        yield temp_path
-        
-        # Cleanup
-        shutil.rmtree(temp_dir)
-
-    @pytest.fixture
-    def builder(self, test_data_dir):
+    def builder(self, temp_data_dir):
         """Create a CMDBGraphBuilder instance with test data."""
-        return CMDBGraphBuilder(data_dir=str(test_data_dir))
+        return CMDBGraphBuilder(data_dir=str(temp_data_dir))
 
-    def test_init(self, test_data_dir):
+    def test_init(self, temp_data_dir):
         """Test CMDBGraphBuilder initialization."""
-        builder = CMDBGraphBuilder(data_dir=str(test_data_dir))
+        builder = CMDBGraphBuilder(data_dir=str(temp_data_dir))
         
-        assert builder.base_path == Path(test_data_dir)
+        assert builder.base_path == Path(temp_data_dir)
         assert isinstance(builder.graph, nx.DiGraph)
         assert builder.tables == {}
         assert builder.relationship_types == {}
@@ -89,42 +69,41 @@ class TestCMDBGraphBuilder:
         assert "pkg_x" in builder.packages
         assert builder.packages["pkg_x"]["name"] == "Package X"
 
-    def test_add_suggested_relationships(self, builder):
+    def test_add_suggested_relationships(self, loaded_builder):
         """Test adding CI relationships from suggestion files."""
-        builder.load_tables()
-        builder.load_relationship_types()
-        
         # Add relationships from cmdb_rel_type_suggest.json
-        count = builder.add_suggested_relationships("cmdb_rel_type_suggest.json")
+        count = loaded_builder.add_suggested_relationships("cmdb_rel_type_suggest.json")
         assert count == 2
-        assert builder.graph.number_of_edges() == 2
+        assert loaded_builder.graph.number_of_edges() == 2
         
         # Check specific relationships
-        assert builder.graph.has_edge("table_e", "table_d")
-        assert builder.graph.has_edge("table_d", "table_b")
+        assert loaded_builder.graph.has_edge("table_e", "table_d")
+        assert loaded_builder.graph.has_edge("table_d", "table_b")
 
-    def test_add_class_hierarchy_edges(self, builder):
+    def test_add_class_hierarchy_edges(self, loaded_builder):
         """Test adding class hierarchy relationships."""
-        builder.load_tables()
-        
-        count = builder.add_class_hierarchy_edges()
+        count = loaded_builder.add_class_hierarchy_edges()
         assert count == 4  # 4 tables have super_class relationships
         
         # Check hierarchy relationships (parent -> child)
-        assert builder.graph.has_edge("table_a", "table_b")
-        assert builder.graph.has_edge("table_b", "table_c")
-        assert builder.graph.has_edge("table_a", "table_d")
-        assert builder.graph.has_edge("table_a", "table_e")
+        assert loaded_builder.graph.has_edge("table_a", "table_b")
+        assert loaded_builder.graph.has_edge("table_b", "table_c")
+        assert loaded_builder.graph.has_edge("table_a", "table_d")
+        assert loaded_builder.graph.has_edge("table_a", "table_e")
         
         # Check edge attributes
-        edge_data = builder.graph.edges["table_a", "table_b"]
+        edge_data = loaded_builder.graph.edges["table_a", "table_b"]
         assert edge_data["relationship_type"] == "class_hierarchy"
         assert edge_data["label"] == "parent of"
         assert edge_data["edge_type"] == "hierarchy"
+        
+        # Each edge gets its own copy of the shared attributes
+        edge_data["label"] = "changed"
+        assert loaded_builder.graph.edges["table_b", "table_c"]["label"] == "parent of"
 
-    def test_build_graph(self, builder):
+    def test_build_graph(self, prebuilt_builder):
         """Test building the complete graph."""
-        graph = builder.build_graph()
+        graph = prebuilt_builder.graph
         
         assert isinstance(graph, nx.DiGraph)
         assert graph.number_of_nodes() > 0
@@ -139,53 +118,52 @@ class TestCMDBGraphBuilder:
         assert len(ci_edges) > 0
         assert len(hierarchy_edges) > 0
 
-    def test_get_table_display_label(self, builder):
+    def test_get_table_display_label(self, loaded_builder):
         """Test getting human-readable table labels."""
-        builder.load_tables()
-        
         # Test with existing table
-        label = builder.get_table_display_label("table_c")
+        label = loaded_builder.get_table_display_label("table_c")
         assert label == "Item C"
         
         # Test with table that has no label (uses name)
-        label = builder.get_table_display_label("nonexistent_table")
+        label = loaded_builder.get_table_display_label("nonexistent_table")
         assert label == "Nonexistent Table"
         
         # Test with length limit
-        label = builder.get_table_display_label("table_c", max_length=3)
+        label = loaded_builder.get_table_display_label("table_c", max_length=3)
         assert len(label) <= 3
+        
+        # Labels are memoized per table and length until the tables are reloaded
+        loaded_builder.tables["table_c"]["label"] = "Changed"
+        assert loaded_builder.get_table_display_label("table_c") == "Item C"
+        loaded_builder.load_tables()
+        loaded_builder.tables["table_c"]["label"] = "Changed"
+        assert loaded_builder.get_table_display_label("table_c") == "Changed"
 
-    def test_get_table_inheritance_chain(self, builder):
+    def test_get_table_inheritance_chain(self, loaded_builder):
         """Test getting inheritance chain for a table."""
-        builder.load_tables()
-        
         # Test inheritance chain for table_c
-        chain = builder.get_table_inheritance_chain("table_c")
+        chain = loaded_builder.get_table_inheritance_chain("table_c")
         assert chain == ["table_c", "table_b", "table_a"]
         
         # Test inheritance chain for base table
-        chain = builder.get_table_inheritance_chain("table_a")
+        chain = loaded_builder.get_table_inheritance_chain("table_a")
         assert chain == ["table_a"]
         
         # Test with nonexistent table
-        chain = builder.get_table_inheritance_chain("nonexistent")
+        chain = loaded_builder.get_table_inheritance_chain("nonexistent")
         assert chain == ["nonexistent"]
 
-    def test_find_inherited_relationships(self, builder):
+    def test_find_inherited_relationships(self, prebuilt_builder):
         """Test finding tables with applicable relationships via inheritance."""
-        builder.build_graph()
-        
-        applicable = builder.find_inherited_relationships("table_c")
+        applicable = prebuilt_builder.find_inherited_relationships("table_c")
         assert "table_c" in applicable
         assert "table_b" in applicable
         assert "table_a" in applicable
 
-    def test_find_all_paths_between_tables(self, builder):
+    def test_find_all_paths_between_tables(self, prebuilt_builder):
         """Test finding paths between tables."""
-        builder.build_graph()
-        
         # Test finding paths with inheritance
-        paths = builder.find_all_paths_between_tables("table_e", "table_c", max_paths=5)
+        paths = prebuilt_builder.find_all_paths_between_tables("table_e", "table_c", max_paths=5)
         assert len(paths) > 0
         
         # Check that we get path tuples (path, ancestor)
@@ -195,40 +173,83 @@ class TestCMDBGraphBuilder:
             path, ancestor = path_info
             assert isinstance(path, list)
             assert len(path) > 0
+        
+        # Paths through the ancestor table_b duplicate the direct paths and are dropped
+        assert paths == [(["table_e", "table_b", "table_c"], None),
+                         (["table_e", "table_d", "table_b", "table_c"], None)]
 
-    def test_create_path_graph_between_tables(self, builder):
-        """Test creating a graph showing paths between tables."""
+    def test_find_all_paths_through_ancestor(self, builder):
+        """Test that paths to an ancestor of the target are reported as inheritance paths."""
         builder.build_graph()
+        builder.graph.add_edge("table_x", "table_b")
+        
+        paths = builder.find_all_paths_between_tables("table_x", "table_c")
+        
+        assert paths == [(["table_x", "table_b", "table_c"], None)]
         
-        path_graph = builder.create_path_graph_between_tables("table_e", "table_c")
+        builder.graph.remove_edge("table_b", "table_c")
+        paths = builder.find_all_paths_between_tables("table_x", "table_c")
+        
+        assert paths == [(["table_x", "table_b", "table_c"], "table_b")]
+
+    def test_create_path_graph_between_tables(self, prebuilt_builder):
+        """Test creating a graph showing paths between tables."""
+        path_graph = prebuilt_builder.create_path_graph_between_tables("table_e", "table_c")
         assert isinstance(path_graph, nx.DiGraph)
         assert path_graph.number_of_nodes() > 0
         assert path_graph.number_of_edges() > 0
 
-    @patch('matplotlib.pyplot.close')
-    @patch('matplotlib.pyplot.savefig')
-    @patch('matplotlib.pyplot.figure')
-    @patch('matplotlib.pyplot.legend')
-    @patch('matplotlib.pyplot.axis')
-    @patch('matplotlib.pyplot.title')
-    @patch('matplotlib.pyplot.tight_layout')
-    @patch('networkx.draw_networkx_edge_labels')
-    @patch('networkx.draw_networkx_labels')
-    @patch('networkx.draw_networkx_edges')
-    @patch('networkx.draw_networkx_nodes')
-    @patch('networkx.planar_layout')
-    def test_visualize_table_graph(self, mock_layout, mock_nodes, mock_edges, 
-                                   mock_labels, mock_edge_labels, mock_tight, 
-                                   mock_title, mock_axis, mock_legend, 
-                                   mock_figure, mock_savefig, mock_close, builder):
-        """Test generating visualization graphs."""
-        # Mock the layout to return valid positions
-        mock_layout.return_value = {
+    def test_create_path_graph_prints_paths(self, prebuilt_builder, capsys):
+        """Test that every path is listed with table display labels."""
+        prebuilt_builder.create_path_graph_between_tables("table_e", "table_c")
+        
+        assert capsys.readouterr().out.splitlines() == [
+            "Path 1: Item E → Item B → Item C",
+            "Path 2: Item E → Item D → Item B → Item C",
+        ]
+
+    def test_create_path_graph_inherited_edge(self, builder):
+        """Test inheritance metadata on a path graph without touching the source graph."""
+        builder.build_graph()
+        builder.graph.add_edge("table_x", "table_b", relationship_type="Uses::Used by")
+        
+        # An edge to the ancestor table_b stands in for the missing edge to table_c
+        path_graph = builder.create_path_graph_between_tables(
+            "table_x", "table_c", precomputed_paths=[(["table_x", "table_c"], "table_b")])
+        
+        assert list(path_graph.edges()) == [("table_x", "table_c")]
+        assert path_graph.edges["table_x", "table_c"] == {
+            "relationship_type": "Uses::Used by", "inherited_edge": True, "inherited_from": "table_b"}
+        assert path_graph.nodes["table_c"]["inherited_target"] is True
+        assert path_graph.nodes["table_c"]["inherited_from"] == "table_b"
+        
+        # Attributes are copied into the path graph, not shared with the full graph
+        path_graph.nodes["table_x"]["marked"] = True
+        assert "marked" not in builder.graph.nodes["table_x"]
+        assert "inherited_target" not in builder.graph.nodes["table_c"]
+
+    @pytest.fixture
+    def no_draw(self, monkeypatch):
+        """Replace the matplotlib and networkx drawing calls with mocks, keyed by name."""
+        mocks = {}
+        for name in ("close", "savefig", "figure", "legend", "axis", "title", "tight_layout"):
+            mocks[name] = MagicMock()
+            monkeypatch.setattr(f"matplotlib.pyplot.{name}", mocks[name])
+        for name in ("draw_networkx_edge_labels", "draw_networkx_labels", "draw_networkx_edges",
+                     "draw_networkx_nodes", "planar_layout"):
+            mocks[name] = MagicMock()
+            monkeypatch.setattr(f"networkx.{name}", mocks[name])
+        
+        # The layout still has to return valid positions
+        mocks["planar_layout"].return_value = {
             "table_e": (0, 0),
             "table_c": (1, 1),
             "table_b": (0.5, 0.5)
         }
-        
+        return mocks
+
+    def test_visualize_table_graph(self, builder, no_draw):
+        """Test generating visualization graphs."""
         builder.build_graph()
         
         # Test successful visualization
@@ -238,43 +259,52 @@ class TestCMDBGraphBuilder:
             shortest_path_only=True
         )
         assert success is True
-        assert mock_figure.call_count >= 1
-        mock_savefig.assert_called_once()
+        assert no_draw["figure"].call_count >= 1
+        no_draw["savefig"].assert_called_once()
+        assert no_draw["savefig"].call_args.kwargs['pil_kwargs'] == {'compress_level': 3}
 
-    def test_visualize_table_graph_no_paths(self, builder):
+    def test_visualize_table_graph_no_paths(self, prebuilt_builder):
         """Test visualization when no paths exist."""
-        builder.build_graph()
-        
         # Test with tables that have no path
-        success = builder.visualize_table_graph(
+        success = prebuilt_builder.visualize_table_graph(
             "nonexistent_table", 
             target_table="another_nonexistent", 
             shortest_path_only=True
         )
         assert success is False
 
-    def test_get_package_display_name(self, builder):
+    def test_get_package_display_name(self, loaded_builder):
         """Test getting package display names."""
-        builder.load_packages()
-        
         # Test with existing package
-        name = builder.get_package_display_name("pkg_x")
+        name = loaded_builder.get_package_display_name("pkg_x")
         assert name == "Package X"
         
         # Test with nonexistent package
-        name = builder.get_package_display_name("nonexistent")
+        name = loaded_builder.get_package_display_name("nonexistent")
         assert name == "Unknown Package"
         
         # Test with empty string
-        name = builder.get_package_display_name("")
+        name = loaded_builder.get_package_display_name("")
         assert name == "Unknown Package"
 
-    def test_node_attributes(self, builder):
+    @pytest.mark.parametrize("source, package_name, expected", [
+        ("pkg_sn", "@servicenow/now-ui", "SN: now-ui"),
+        ("pkg_dev", "@devsnc/sn-workspace", "DevSNC: sn-workspace"),
+        ("pkg_com", "com.glide.service-portal", "Service Portal"),
+        ("pkg_com_short", "com.glide", "com.glide"),
+        ("sn_itom_discovery", "sn_itom_discovery", "Sn Itom Discovery"),
+        ("sn_hr", "Human Resources", "Human Resources"),
+        ("pkg_long", "com.snc.a_very_long_package-name_indeed", "A Very Long Package Name In..."),
+    ])
+    def test_get_package_display_name_prefixes(self, builder, source, package_name, expected):
+        """Test the cleanup applied to each known package name prefix."""
+        builder.packages[source] = {'name': package_name}
+        
+        assert builder.get_package_display_name(source) == expected
+
+    def test_node_attributes(self, loaded_builder):
         """Test node attributes are set correctly."""
-        builder.load_tables()
-        builder.load_packages()
-        
-        attrs = builder._get_node_attributes("table_c")
+        attrs = loaded_builder._get_node_attributes("table_c")
         assert attrs["label"] == "Item C"
         assert attrs["super_class"] == "table_b"
         assert attrs["scope"] == "global"
@@ -293,4 +323,585 @@ class TestCMDBGraphBuilder:
         # Tables should be empty
         assert len(builder.tables) == 0
         assert len(builder.relationship_types) == 0
-        assert len(builder.packages) == 0
\ No newline at end of file
+        assert len(builder.packages) == 0
+
+    def test_build_graph_cache(self, temp_data_dir, monkeypatch, tmp_path):
+        """Test that a cached graph is reused until the data files change."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        
+        first = CMDBGraphBuilder(data_dir=str(temp_data_dir))
+        graph = first.build_graph(use_cache=True)
+        assert first.get_graph_cache_file().exists()
+        
+        # A second builder restores the graph without reading the JSON files
+        second = CMDBGraphBuilder(data_dir=str(temp_data_dir))
+        with patch.object(CMDBGraphBuilder, 'load_tables', side_effect=AssertionError("cache not used")):
+            cached_graph = second.build_graph(use_cache=True)
+        assert set(cached_graph.edges()) == set(graph.edges())
+        assert second.tables == first.tables
+        
+        # Touching a data file produces a different cache key
+        data_file = temp_data_dir / "sys_db_object.json"
+        data_file.write_text(data_file.read_text() + "\n")
+        assert not CMDBGraphBuilder(data_dir=str(temp_data_dir)).get_graph_cache_file().exists()
+
+    def test_has_path_between_tables(self, prebuilt_builder):
+        """Test the reachability precheck used before rendering."""
+        # Direct and inheritance-based reachability
+        assert prebuilt_builder.has_path_between_tables("table_e", "table_b") is True
+        assert prebuilt_builder.has_path_between_tables("table_e", "table_c") is True
+        
+        # Unknown source table
+        assert prebuilt_builder.has_path_between_tables("nonexistent", "table_c") is False
+        
+        # table_c has no outgoing edges
+        assert prebuilt_builder.has_path_between_tables("table_c", "table_e") is False
+
+    def test_create_path_graph_with_precomputed_paths(self, prebuilt_builder):
+        """Test that precomputed paths are drawn without searching again."""
+        paths = prebuilt_builder.compute_paths("table_e", "table_c", shortest_path_only=True)
+        assert len(paths) == 1
+        
+        with patch.object(prebuilt_builder, 'find_all_paths_between_tables') as mock_find:
+            path_graph = prebuilt_builder.create_path_graph_between_tables(
+                "table_e", "table_c", precomputed_paths=paths
+            )
+            mock_find.assert_not_called()
+        
+        assert set(path_graph.nodes()) == set(paths[0][0])
+
+    @pytest.mark.parametrize("parser", ["ijson", "orjson", "json"])
+    def test_iter_records(self, builder, parser, monkeypatch):
+        """Test reading export records with each of the supported parsers."""
+        from sn_cmdb_map import graph_builder
+        
+        if parser != "json" and not getattr(graph_builder, f"{parser.upper()}_AVAILABLE"):
+            pytest.skip(f"{parser} is not installed")
+        monkeypatch.setattr(graph_builder, "IJSON_AVAILABLE", parser == "ijson")
+        monkeypatch.setattr(graph_builder, "ORJSON_AVAILABLE", parser == "orjson")
+        
+        records = list(builder._iter_records(builder.base_path / "sys_db_object.json"))
+        assert [record["name"] for record in records] == ["table_a", "table_b", "table_c", "table_d", "table_e"]
+        
+        # Files without a records array yield nothing
+        empty_file = builder.base_path / "empty.json"
+        empty_file.write_text("{}")
+        assert list(builder._iter_records(empty_file)) == []
+
+    @pytest.mark.parametrize("parser", ["msgspec", "ijson", "orjson", "json"])
+    def test_build_graph_with_each_parser(self, builder, prebuilt_builder, parser, monkeypatch):
+        """Test that every parser backend loads the exports into the same graph."""
+        from sn_cmdb_map import graph_builder
+        
+        if parser != "json" and not getattr(graph_builder, f"{parser.upper()}_AVAILABLE"):
+            pytest.skip(f"{parser} is not installed")
+        monkeypatch.setattr(graph_builder, "MSGSPEC_AVAILABLE", parser == "msgspec")
+        monkeypatch.setattr(graph_builder, "IJSON_AVAILABLE", parser == "ijson")
+        monkeypatch.setattr(graph_builder, "ORJSON_AVAILABLE", parser == "orjson")
+        
+        builder.build_graph()
+        
+        assert builder.tables == prebuilt_builder.tables
+        assert builder.relationship_types == prebuilt_builder.relationship_types
+        assert builder.packages == prebuilt_builder.packages
+        assert dict(builder.graph.nodes(data=True)) == dict(prebuilt_builder.graph.nodes(data=True))
+        assert {(u, v): d for u, v, d in builder.graph.edges(data=True)} == \
+            {(u, v): d for u, v, d in prebuilt_builder.graph.edges(data=True)}
+
+    def test_load_tables_forward_super_class(self, builder):
+        """Test that a super_class defined later in the export is still resolved."""
+        tables_file = builder.base_path / "sys_db_object.json"
+        tables_file.write_text(json.dumps({"records": [
+            {"name": "child", "sys_id": "child_id", "super_class": "parent_id"},
+            {"name": "parent", "sys_id": "parent_id", "super_class": ""},
+        ]}))
+        
+        builder.load_tables()
+        
+        assert builder.tables["child"]["super_class"] == "parent"
+        assert builder.tables["child"]["super_class_id"] == "parent_id"
+        assert builder.tables["parent"]["super_class"] == ""
+
+    def test_node_attributes_memoized(self, loaded_builder):
+        """Test that node attributes are computed once per table and reset on reload."""
+        attrs = loaded_builder._get_node_attributes("table_c")
+        assert loaded_builder._get_node_attributes("table_c") is attrs
+        
+        loaded_builder.load_tables()
+        assert loaded_builder._get_node_attributes("table_c") is not attrs
+        assert loaded_builder._get_node_attributes("table_c") == attrs
+
+    def test_load_tables_indexes_subclasses(self, builder):
+        """Test the super_class to subclasses index used for hierarchy edges."""
+        builder.load_tables()
+        
+        assert sorted(builder._children_of["table_a"]) == ["table_b", "table_d", "table_e"]
+        assert builder._children_of["table_b"] == ["table_c"]
+        assert "table_c" not in builder._children_of
+
+    def test_get_graph_statistics(self, prebuilt_builder):
+        """Test graph statistics and the ranking of central nodes."""
+        stats = prebuilt_builder.get_graph_statistics()
+        assert stats['nodes'] == 5
+        assert stats['edges'] == 7
+        assert stats['average_degree'] == pytest.approx(2 * 7 / 5)
+        
+        # Ties between table_e, table_d and table_a keep graph order
+        top_nodes = [node for node, _ in stats['top_central_nodes']]
+        assert top_nodes == ["table_b", "table_e", "table_d", "table_a", "table_c"]
+
+    def test_export_png_large_graph_uses_datashader(self, builder, tmp_path, monkeypatch):
+        """Test that graphs over the node cap are rasterized whole when datashader is available."""
+        from sn_cmdb_map import graph_builder
+        builder.build_graph()
+        monkeypatch.setattr(graph_builder, "DATASHADER_AVAILABLE", True)
+        
+        with patch.object(builder, "_export_datashader_graph", return_value=True) as mock_export:
+            assert builder._export_png_graph(tmp_path / "graph.png", max_nodes=2)
+        
+        mock_export.assert_called_once_with(tmp_path / "graph.png")
+
+    def test_export_png_large_graph_subset(self, builder, tmp_path, monkeypatch):
+        """Test that graphs over the node cap are drawn from a subset of the largest component."""
+        from sn_cmdb_map import graph_builder
+        builder.build_graph()
+        monkeypatch.setattr(graph_builder, "DATASHADER_AVAILABLE", False)
+        
+        with patch.object(builder, "_get_layout", side_effect=lambda graph, layout: (nx.circular_layout(graph), "circular")) as mock_layout:
+            assert builder._export_png_graph(tmp_path / "graph.png", max_nodes=3)
+        
+        subgraph = mock_layout.call_args.args[0]
+        assert subgraph.number_of_nodes() == 3
+        assert set(subgraph) <= set(builder.graph)
+
+    @pytest.mark.skipif(not hasattr(nx, "forceatlas2_layout"), reason="requires NetworkX 3.4+")
+    def test_auto_layout_prefers_forceatlas2_for_large_graphs(self, builder):
+        """Test that auto layout skips kamada_kawai once a graph exceeds its node limit."""
+        from sn_cmdb_map import graph_builder
+        graph = nx.path_graph(graph_builder.KAMADA_KAWAI_MAX_NODES + 1)
+        graph.add_edges_from([(0, 2), (1, 3), (0, 3), (0, 4), (1, 4), (2, 4)])  # K5 keeps it non-planar
+        
+        with patch("networkx.kamada_kawai_layout") as mock_kk:
+            pos, layout_used = builder._apply_layout(graph, "auto")
+        
+        assert layout_used == "forceatlas2"
+        assert set(pos) == set(graph.nodes())
+        mock_kk.assert_not_called()
+
+    def test_auto_layout_uses_spectral_for_very_large_graphs(self, builder):
+        """Test that auto layout goes to the spectral layout for graphs of SPECTRAL_MIN_NODES or more."""
+        from sn_cmdb_map import graph_builder
+        graph = nx.path_graph(graph_builder.SPECTRAL_MIN_NODES)
+        graph.add_edges_from([(0, 2), (1, 3), (0, 3), (0, 4), (1, 4), (2, 4)])  # K5 keeps it non-planar
+        spectral_pos = {node: (0.0, 0.0) for node in graph}
+        
+        with patch.multiple("networkx", create=True, kamada_kawai_layout=DEFAULT, forceatlas2_layout=DEFAULT,
+                            spectral_layout=MagicMock(return_value=spectral_pos)) as mocks:
+            pos, layout_used = builder._apply_layout(graph, "auto")
+        
+        assert layout_used == "spectral"
+        assert pos is spectral_pos
+        mocks["kamada_kawai_layout"].assert_not_called()
+        mocks["forceatlas2_layout"].assert_not_called()
+
+    @pytest.mark.skipif(not hasattr(nx, "forceatlas2_layout"), reason="requires NetworkX 3.4+")
+    def test_auto_layout_falls_back_to_forceatlas2_before_spring(self, builder):
+        """Test that a failed spectral layout on a large graph is followed by forceatlas2, not spring."""
+        from sn_cmdb_map import graph_builder
+        graph = nx.path_graph(graph_builder.SPECTRAL_MIN_NODES)
+        graph.add_edges_from([(0, 2), (1, 3), (0, 3), (0, 4), (1, 4), (2, 4)])  # K5 keeps it non-planar
+        fa2_pos = {node: (0.0, 0.0) for node in graph}
+        
+        with patch.multiple("networkx", spectral_layout=MagicMock(side_effect=ImportError("scipy")),
+                            forceatlas2_layout=MagicMock(return_value=fa2_pos), spring_layout=DEFAULT) as mocks:
+            pos, layout_used = builder._apply_layout(graph, "auto")
+        
+        assert layout_used == "forceatlas2"
+        mocks["spring_layout"].assert_not_called()
+
+    def test_layout_cache(self, builder, monkeypatch, tmp_path):
+        """Test that layouts are reused for an unchanged graph when caching is enabled."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        builder.build_graph(use_cache=True)
+        
+        pos, layout_used = builder._get_layout(builder.graph, "circular")
+        assert builder.get_layout_cache_file(builder.graph, "circular").exists()
+        
+        # Forget the in-memory copy so the layout has to come from disk
+        builder._layout_memo.clear()
+        with patch.object(builder, "_apply_layout", side_effect=AssertionError("cache not used")):
+            cached_pos, cached_layout = builder._get_layout(builder.graph, "circular")
+        assert cached_layout == layout_used
+        assert set(cached_pos) == set(pos)
+        
+        # A different layout or a different graph gets its own entry
+        assert builder.get_layout_cache_file(builder.graph, "spring") != builder.get_layout_cache_file(builder.graph, "circular")
+        smaller = builder.graph.subgraph(["table_a", "table_b"])
+        assert builder.get_layout_cache_file(smaller, "circular") != builder.get_layout_cache_file(builder.graph, "circular")
+
+    def test_layout_memo(self, builder):
+        """Test that a layout is computed once per graph topology within a builder."""
+        builder.build_graph()
+        
+        with patch.object(builder, "_apply_layout", wraps=builder._apply_layout) as mock_apply:
+            pos, layout_used = builder._get_layout(builder.graph, "circular")
+            pos["table_a"] = (0.0, 0.0)
+            # A copy with the same nodes and edges reuses the first result
+            same_pos, same_layout = builder._get_layout(builder.graph.copy(), "circular")
+            builder._get_layout(builder.graph, "spring")
+        
+        assert mock_apply.call_count == 2
+        assert same_layout == layout_used
+        assert tuple(same_pos["table_a"]) != (0.0, 0.0)
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_export_graph_json(self, builder, use_orjson, monkeypatch):
+        """Test the node-link JSON export with and without orjson."""
+        from sn_cmdb_map import graph_builder
+        
+        if use_orjson and not graph_builder.ORJSON_AVAILABLE:
+            pytest.skip("orjson is not installed")
+        monkeypatch.setattr(graph_builder, "ORJSON_AVAILABLE", use_orjson)
+        builder.build_graph()
+        
+        output_path = builder.export_graph("json", "graph.json")
+        
+        graph_data = json.loads(Path(output_path).read_text(encoding='utf-8'))
+        assert {node["id"] for node in graph_data["nodes"]} == set(builder.graph.nodes())
+
+    def test_build_graph_inserts_edges_once(self, builder):
+        """Test that build_graph buffers every edge and inserts them in a single pass."""
+        with patch.object(nx.DiGraph, "add_edges_from", autospec=True,
+                          side_effect=nx.DiGraph.add_edges_from) as mock_add_edges:
+            graph = builder.build_graph()
+        
+        mock_add_edges.assert_called_once()
+        assert graph.number_of_edges() == 7
+        assert builder._pending_nodes == {}
+        assert builder._pending_edges == []
+
+    def test_get_graph_statistics_sparse(self, builder):
+        """Test that the CSR statistics match the NetworkX implementation."""
+        from sn_cmdb_map import graph_builder
+        
+        pytest.importorskip("scipy")
+        builder.build_graph()
+        builder.graph.add_node("table_isolated")
+        
+        sparse_stats = builder._get_graph_statistics_sparse()
+        with patch.object(graph_builder, "SCIPY_AVAILABLE", False):
+            networkx_stats = builder.get_graph_statistics()
+        
+        assert sparse_stats == networkx_stats
+        assert sparse_stats['number_of_components'] == 2
+
+    def test_get_graph_statistics_sparse_larger_graph(self, tmp_path):
+        """Test the CSR statistics against NetworkX on a graph with degree ties and self-loops."""
+        from sn_cmdb_map import graph_builder
+        
+        pytest.importorskip("scipy")
+        builder = CMDBGraphBuilder(data_dir=str(tmp_path))
+        graph = nx.gnp_random_graph(60, 0.04, seed=7, directed=True)
+        graph.add_edges_from([(0, 0), (5, 5)])
+        builder.graph = nx.relabel_nodes(graph, lambda node: f"table_{node}")
+        
+        sparse_stats = builder._get_graph_statistics_sparse()
+        with patch.object(graph_builder, "SCIPY_AVAILABLE", False):
+            networkx_stats = builder.get_graph_statistics()
+        
+        assert sparse_stats == networkx_stats
+
+    def test_inheritance_chains_precomputed(self, loaded_builder):
+        """Test that inheritance chains are walked once when the tables are loaded."""
+        with patch.object(loaded_builder, "_walk_inheritance_chain", side_effect=AssertionError("chain walked again")):
+            assert loaded_builder.get_table_inheritance_chain("table_c") == ["table_c", "table_b", "table_a"]
+            
+            # Callers get their own list to modify
+            loaded_builder.get_table_inheritance_chain("table_c").append("changed")
+            assert loaded_builder.get_table_inheritance_chain("table_c") == ["table_c", "table_b", "table_a"]
+
+    def test_import_does_not_load_matplotlib(self):
+        """Test that building graphs without rendering does not import matplotlib."""
+        import subprocess
+        import sys
+        
+        code = "import sys, sn_cmdb_map.graph_builder; print('matplotlib' in sys.modules, 'networkx_viewer' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        
+        assert result.stdout.strip() == "False False"
+
+    def test_import_does_not_load_datashader(self):
+        """Test that importing the graph builder does not import the datashader stack or SciPy."""
+        import subprocess
+        import sys
+        
+        code = ("import sys, sn_cmdb_map.graph_builder; "
+                "print('datashader' in sys.modules, 'pandas' in sys.modules, 'scipy' in sys.modules)")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        
+        assert result.stdout.strip() == "False False False"
+
+    def test_load_matplotlib_sets_backend_once(self):
+        """Test that matplotlib is set up on the first render only."""
+        from sn_cmdb_map import graph_builder
+        
+        with patch("sn_cmdb_map.graph_builder._MATPLOTLIB", None), \
+             patch("matplotlib.use") as mock_use:
+            first = graph_builder._load_matplotlib()
+            second = graph_builder._load_matplotlib()
+        
+        assert first is second
+        mock_use.assert_called_once_with('Agg')
+
+    def test_export_png_labels_highest_degree_nodes(self, builder, tmp_path):
+        """Test that the PNG export labels nodes in order of degree."""
+        builder.build_graph()
+        
+        with patch("networkx.draw_networkx_labels") as mock_labels:
+            assert builder._export_png_graph(tmp_path / "graph.png")
+        
+        labels = mock_labels.call_args.kwargs['labels']
+        assert list(labels) == ["table_b", "table_e", "table_d", "table_a", "table_c"]
+        assert (tmp_path / "graph.png").exists()
+
+    def test_export_graph_graphml(self, builder):
+        """Test that the streamed GraphML export reads back as the same graph."""
+        builder.build_graph()
+        builder.graph.nodes["table_a"]["label"] = 'Item <A> & "friends"'
+        
+        output_path = builder.export_graph("graphml", "graph.graphml")
+        
+        graph = nx.read_graphml(output_path)
+        assert dict(graph.nodes(data=True)) == dict(builder.graph.nodes(data=True))
+        assert {(u, v): d for u, v, d in graph.edges(data=True)} == \
+            {(u, v): d for u, v, d in builder.graph.edges(data=True)}
+        
+        # Attribute types the streaming writer does not handle fall back to NetworkX
+        builder.graph.nodes["table_a"]["tags"] = None
+        with patch("networkx.write_graphml") as mock_write:
+            builder.export_graph("graphml", "graph.graphml")
+        mock_write.assert_called_once()
+
+    def test_export_graph_graphml_mixed_attribute_types(self, builder, tmp_path):
+        """Test that an attribute holding values of different types round-trips through GraphML."""
+        builder.build_graph()
+        builder.graph.nodes["table_a"]["order"] = 1
+        builder.graph.nodes["table_b"]["order"] = "second"
+        
+        # The streaming writer declares one type per attribute, so it leaves these to NetworkX
+        assert not builder._fast_write_graphml(tmp_path / "graph.graphml")
+        assert not (tmp_path / "graph.graphml").exists()
+        
+        output_path = builder.export_graph("graphml", "graph.graphml")
+        
+        graph = nx.read_graphml(output_path)
+        assert graph.nodes["table_a"]["order"] == 1
+        assert graph.nodes["table_b"]["order"] == "second"
+        assert dict(graph.nodes(data=True)) == dict(builder.graph.nodes(data=True))
+
+    @pytest.mark.parametrize("use_msgspec", [True, False])
+    def test_iter_fields(self, builder, use_msgspec, monkeypatch):
+        """Test reading selected record fields with and without msgspec."""
+        from sn_cmdb_map import graph_builder
+        
+        if use_msgspec and not graph_builder.MSGSPEC_AVAILABLE:
+            pytest.skip("msgspec is not installed")
+        monkeypatch.setattr(graph_builder, "MSGSPEC_AVAILABLE", use_msgspec)
+        
+        export_file = builder.base_path / "fields.json"
+        export_file.write_text(json.dumps({"records": [
+            {"name": "table_x", "label": "Table X", "unused": {"nested": [1, 2]}},
+            {"name": "table_y"}
+        ]}))
+        
+        fields = (("name", ""), ("label", None), ("sys_scope", "global"))
+        assert list(builder._iter_fields(export_file, fields)) == [
+            ("table_x", "Table X", "global"),
+            ("table_y", None, "global"),
+        ]
+
+    def test_create_table_centered_graph(self, prebuilt_builder):
+        """Test the table-centered graph including inherited relationships."""
+        centered = prebuilt_builder.create_table_centered_graph("table_c")
+        
+        # Every edge touching table_c or its ancestors table_b and table_a
+        assert set(centered.edges()) == set(prebuilt_builder.graph.edges()) - {("table_e", "table_d")}
+        assert centered.nodes["table_b"]["inherited_from"] == "table_b"
+        assert "inherited_from" not in centered.nodes["table_e"]
+        assert centered.edges["table_a", "table_b"]["inherited_from_source"] == "table_a"
+        assert centered.edges["table_a", "table_b"]["inherited_from_target"] == "table_b"
+        assert centered.edges["table_a", "table_b"]["target_table"] == "table_c"
+        # Attributes passed through unchanged are still copies
+        assert "inherited_from" not in prebuilt_builder.graph.nodes["table_b"]
+        centered.nodes["table_e"]["marked"] = True
+        assert "marked" not in prebuilt_builder.graph.nodes["table_e"]
+        assert prebuilt_builder.create_table_centered_graph("nonexistent") is None
+
+    def test_create_table_centered_graph_second_level_limit(self, builder):
+        """Test that second-level neighbors are added until the graph has 20 nodes."""
+        builder.graph = nx.DiGraph()
+        for i in range(5):
+            builder.graph.add_edge("hub", f"neighbor_{i}")
+            for j in range(10):
+                builder.graph.add_edge(f"neighbor_{i}", f"leaf_{i}_{j}")
+        builder.graph.add_edge("source_0", "neighbor_0")
+        
+        centered = builder.create_table_centered_graph("hub")
+        
+        assert centered.number_of_nodes() == 20
+        for source, target in centered.edges():
+            assert builder.graph.has_edge(source, target)
+            assert "hub" in (source, target) or source.startswith("neighbor_") or target.startswith("neighbor_")
+
+    def test_find_all_paths_stops_at_max_paths(self, builder):
+        """Test that longer paths are not searched once max_paths paths are found."""
+        builder.build_graph()
+        builder.graph.add_edge("table_x", "table_c")
+        builder.graph.add_edge("table_x", "table_b")
+        
+        with patch.object(builder, "_iter_paths_of_length", wraps=builder._iter_paths_of_length) as mock_paths:
+            paths = builder.find_all_paths_between_tables("table_x", "table_c", max_paths=1)
+        
+        assert paths == [(["table_x", "table_c"], None)]
+        # Only direct paths of zero and one edge were searched
+        assert [call.args[:3] for call in mock_paths.call_args_list] == [
+            ("table_x", "table_c", 0), ("table_x", "table_c", 1)]
+
+    def test_auto_layout_skips_planarity_test_on_dense_graphs(self, builder):
+        """Test that graphs over Euler's edge bound go past planar without a planarity test."""
+        dense = nx.complete_graph(6, create_using=nx.DiGraph)
+        
+        with patch("networkx.planar_layout") as mock_planar:
+            pos, layout_used = builder._apply_layout(dense, "auto")
+        
+        mock_planar.assert_not_called()
+        assert layout_used != "planar"
+        assert set(pos) == set(dense)
+        
+        # Edges in both directions count once, so a 4-clique is still planar
+        pos, layout_used = builder._apply_layout(nx.complete_graph(4, create_using=nx.DiGraph), "auto")
+        assert layout_used == "planar"
+
+    def test_generate_all_table_graphs_reuses_figure(self, builder):
+        """Test that all table graphs are drawn on one figure that is closed at the end."""
+        import matplotlib.pyplot as plt
+        
+        builder.build_graph()
+        plt.close('all')
+        
+        with patch.object(builder, "_get_layout", side_effect=lambda graph, layout: (nx.circular_layout(graph), "circular")), \
+             patch("matplotlib.pyplot.figure", wraps=plt.figure) as mock_figure:
+            generated = builder.generate_all_table_graphs(output_dir="table_graphs")
+        
+        assert generated == 5
+        assert sorted(path.name for path in (builder.output_base_dir / "table_graphs").iterdir()) == [
+            "table_a.png", "table_b.png", "table_c.png", "table_d.png", "table_e.png"]
+        # One new figure; every later call only reselects it
+        new_figures = [call for call in mock_figure.call_args_list if not call.args]
+        assert len(new_figures) == 1
+        assert plt.get_fignums() == []
+
+    def test_generate_all_table_graphs_max_tables(self, builder):
+        """Test that only the tables with the most relationships are drawn when limited."""
+        builder.build_graph()
+        
+        with patch.object(builder, "visualize_table_graph", return_value=True) as mock_visualize:
+            generated = builder.generate_all_table_graphs(max_tables=3)
+        
+        assert generated == 3
+        assert [call.args[0] for call in mock_visualize.call_args_list] == ["table_b", "table_e", "table_d"]
+
+    def test_generate_all_table_graphs_parallel(self, builder):
+        """Test rendering the table graphs in worker processes."""
+        builder.build_graph()
+        
+        generated = builder.generate_all_table_graphs(output_dir="table_graphs", jobs=2)
+        
+        assert generated == 5
+        assert sorted(path.name for path in (builder.output_base_dir / "table_graphs").iterdir()) == [
+            "table_a.png", "table_b.png", "table_c.png", "table_d.png", "table_e.png"]
+
+    def test_get_largest_component(self, builder):
+        """Test picking the largest weakly connected component, first found on ties."""
+        builder.graph = nx.DiGraph([("a", "b"), ("c", "d"), ("d", "e"), ("f", "g"), ("g", "h")])
+        
+        assert builder._get_largest_component() == {"c", "d", "e"}
+
+    def test_get_scope_node_colors(self, builder):
+        """Test whole-graph node colors and legend entries by scope and package."""
+        builder.tables = {
+            "global_table": {"scope": "global", "package": "sn_itom"},
+            "sn_table": {"scope": "scoped", "package": "sn_itom"},
+            "plugin_table": {"scope": "scoped", "package": "com.glide.portal"},
+            "custom_table": {"scope": "scoped", "package": "x_custom"},
+        }
+        
+        node_colors, package_groups = builder._get_scope_node_colors(
+            ["global_table", "sn_table", "plugin_table", "custom_table", "unknown_table", "sn_table"])
+        
+        assert node_colors == ['#4CAF50', '#9C27B0', '#FF9800', '#607D8B', '#2196F3', '#9C27B0']
+        assert package_groups == {
+            'Global Scope': '#4CAF50',
+            'ServiceNow Packages': '#9C27B0',
+            'Plugins/Extensions': '#FF9800',
+            'Other Packages': '#607D8B',
+            'Other/Unknown': '#2196F3',
+        }
+
+    def test_split_edges_by_type(self):
+        """Test that edges are bucketed by edge_type, defaulting to CI relationships."""
+        graph = nx.DiGraph()
+        graph.add_edge("a", "b", edge_type="hierarchy")
+        graph.add_edge("b", "c", edge_type="ci")
+        graph.add_edge("c", "d")
+        graph.add_edge("d", "e", edge_type="other")
+        
+        ci_edges, hierarchy_edges = CMDBGraphBuilder._split_edges_by_type(graph)
+        
+        assert ci_edges == [("b", "c"), ("c", "d"), ("d", "e")]
+        assert hierarchy_edges == [("a", "b")]
+
+    def test_find_all_paths_searches_ancestors_together(self, builder):
+        """Test that the paths to all ancestors of the target come from one traversal per length."""
+        builder.build_graph()
+        builder.graph.add_edge("table_x", "table_a")
+        builder.graph.add_edge("table_x", "table_b")
+        builder.graph.remove_edge("table_b", "table_c")
+        builder.graph.remove_edge("table_a", "table_b")
+        
+        with patch.object(builder, "_iter_paths_to_any", wraps=builder._iter_paths_to_any) as mock_paths:
+            paths = builder.find_all_paths_between_tables("table_x", "table_c", max_path_length=1)
+        
+        # table_c inherits from table_b, which inherits from table_a
+        assert paths == [(["table_x", "table_b", "table_c"], "table_b"),
+                         (["table_x", "table_a", "table_c"], "table_a")]
+        assert [call.args[:3] for call in mock_paths.call_args_list] == [
+            ("table_x", {"table_b", "table_a"}, 0), ("table_x", {"table_b", "table_a"}, 1)]
+
+    def test_find_all_paths_unreachable_target(self, prebuilt_builder):
+        """Test that no path search is started when the target cannot be reached."""
+        with patch.object(prebuilt_builder, "_iter_paths_of_length") as mock_paths:
+            paths = prebuilt_builder.find_all_paths_between_tables("table_c", "table_a")
+        
+        assert paths == []
+        mock_paths.assert_not_called()
+
+    def test_visualize_table_graph_package_colors(self, builder):
+        """Test node colors and legend entries for scoped package tables."""
+        builder.build_graph()
+        builder.packages["com.glide.portal"] = {'name': "com.glide.portal"}
+        for table_name, package in (("table_b", "sn_itom"), ("table_d", "com.glide.portal"), ("table_a", "x_custom")):
+            builder.tables[table_name].update(scope="scoped", package=package)
+        
+        with patch("networkx.draw_networkx_nodes") as mock_nodes, \
+             patch("matplotlib.pyplot.legend") as mock_legend, \
+             patch("matplotlib.pyplot.savefig"):
+            assert builder.visualize_table_graph("table_e", target_table="table_c", layout="circular")
+        
+        nodes = list(mock_nodes.call_args.args[0].nodes())
+        colors = dict(zip(nodes, mock_nodes.call_args.kwargs['node_color']))
+        assert colors["table_b"] == "#9C27B0"
+        assert colors["table_d"] == "#FF9800"
+        legend_labels = {handle.get_label() for handle in mock_legend.call_args.kwargs['handles']}
+        assert "Plugin (Portal)" in legend_labels
+        assert "SN Package (Unknown Package)" in legend_labels